@@ -0,0 +1,59 @@
+
+# benchmarks/bench_clipboard.py
+import hashlib
+import random
+import threading
+import time
+from typing import Dict, List
+
+from benchmarks.common import result
+from core.clipboard_monitor import ClipboardMonitor
+
+
+class FakeClipboard:
+    """内存中的剪贴板，记录每次写入的时间"""
+
+    def __init__(self):
+        self.content = ""
+        self.copied_at = {}
+
+    def copy(self, text: str):
+        self.copied_at[text] = time.perf_counter()
+        self.content = text
+
+    def paste(self) -> str:
+        return self.content
+
+
+def run(intervals: List[float], repeat: int) -> List[Dict]:
+    """从哈希值被复制到剪贴板，到 ClipboardMonitor 回调触发的延迟"""
+    results = []
+    for interval in intervals:
+        clipboard = FakeClipboard()
+        monitor = ClipboardMonitor(paste=clipboard.paste, interval=interval)
+        detected = {}
+        event = threading.Event()
+
+        def on_hash(value):
+            detected[value] = time.perf_counter()
+            event.set()
+
+        thread = threading.Thread(target=monitor.start, args=(on_hash,), daemon=True)
+        thread.start()
+        time.sleep(interval)
+
+        samples = []
+        for i in range(repeat):
+            value = hashlib.sha256(f"{interval}-{i}".encode()).hexdigest()
+            event.clear()
+            # 随机错开复制时间，避免和轮询周期对齐
+            time.sleep(random.uniform(0, interval))
+            clipboard.copy(value)
+            if not event.wait(interval * 4 + 1):
+                raise TimeoutError("等待剪贴板回调超时")
+            samples.append(detected[value] - clipboard.copied_at[value])
+
+        monitor.stop()
+        thread.join(interval * 2 + 1)
+        results.append(result('clipboard.detect', {'interval': interval}, samples))
+    return results
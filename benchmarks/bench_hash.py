@@ -0,0 +1,49 @@
+
+# benchmarks/bench_hash.py
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.common import format_size, make_file, result
+from core.hash_calculator import HashCalculator
+
+
+def _time(func, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(workdir: Path, sizes: List[int], chunk_sizes: List[int], repeat: int) -> List[Dict]:
+    """
+    比较 calculate（一次读取同时计算四种哈希）与 calculate_single（只算 SHA256）
+    结果为热缓存下的数据：每个文件先完整读取一遍再计时
+    """
+    calculator = HashCalculator(drop_cache=False)  # 保持热缓存，结果只反映计算开销
+    results = []
+
+    for size in sizes:
+        path = make_file(workdir, size)
+        calculator.calculate_single(str(path))  # 预热页缓存
+
+        for chunk_size in chunk_sizes:
+            params = {'size': format_size(size), 'chunk_size': chunk_size}
+
+            samples = _time(lambda: calculator.calculate(str(path), chunk_size), repeat)
+            results.append(result('hash.calculate', params, samples,
+                                  throughput_mb_s=_throughput(size, samples)))
+
+            samples = _time(lambda: calculator.calculate_single(str(path), 'sha256', chunk_size), repeat)
+            results.append(result('hash.calculate_single', params, samples,
+                                  throughput_mb_s=_throughput(size, samples)))
+
+    return results
+
+
+def _throughput(size: int, samples: List[float]) -> float:
+    """按最快一次计算吞吐量（MB/s）"""
+    best = min(samples)
+    return round(size / (1024 * 1024) / best, 2) if best > 0 else 0.0
@@ -0,0 +1,82 @@
+
+# benchmarks/bench_monitor.py
+import contextlib
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.common import format_size, result
+from sim.stubs import StubNotifier
+
+
+def _write(path: Path, data: bytes, size: int) -> float:
+    """写入文件并返回关闭时间"""
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining > 0:
+            n = min(remaining, len(data))
+            f.write(data[:n])
+            remaining -= n
+    return time.perf_counter()
+
+
+@contextlib.contextmanager
+def _app(folder: Path):
+    """
+    在 folder 上运行真实的 EasyShaApp（无界面模式，通知替换为 StubNotifier）
+    测到的延迟包含 I/O 调度、记录缓存、摘要索引、剪贴板期望等完整处理流程
+    """
+    from config import Config
+    from main import EasyShaApp
+
+    if folder.exists():
+        shutil.rmtree(folder)
+    config = Config(download_folders=[str(folder)], supported_extensions=[], headless=True)
+    notifier = StubNotifier()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        app = EasyShaApp(config, notifier=notifier)
+        app.start()
+        time.sleep(0.2)  # 等待 observer 就绪
+        try:
+            yield notifier
+        finally:
+            app.shutdown()
+
+
+def run_latency(workdir: Path, sizes: List[int], repeat: int, timeout: float) -> List[Dict]:
+    """单个文件从写入完成到出现结论（通知）的端到端延迟"""
+    folder = workdir / 'watch_latency'
+    results = []
+    with _app(folder) as notifier:
+        for size in sizes:
+            data = bytes(range(256)) * 4096
+            samples = []
+            for i in range(repeat):
+                name = f"latency_{format_size(size)}_{i}.bin"
+                closed = _write(folder / name, data, size)
+                samples.append(notifier.wait_verdict(name, closed, timeout) - closed)
+            results.append(result('monitor.event_to_verdict',
+                                  {'size': format_size(size)}, samples))
+    return results
+
+
+def run_burst(workdir: Path, count: int, size: int, timeout: float) -> List[Dict]:
+    """模拟一次性完成大量下载：连续写入 count 个文件，统计每个文件的延迟和总耗时"""
+    folder = workdir / 'watch_burst'
+    with _app(folder) as notifier:
+        data = bytes(range(256)) * 4096
+        start = time.perf_counter()
+        closed = {}
+        for i in range(count):
+            name = f"burst_{i}.bin"
+            closed[name] = _write(folder / name, data, size)
+
+        samples = [notifier.wait_verdict(name, t, timeout) - t for name, t in closed.items()]
+        total = max(t + s for t, s in zip(closed.values(), samples)) - start
+
+    params = {'count': count, 'size': format_size(size)}
+    return [result('monitor.burst', params, samples,
+                   total_seconds=round(total, 4),
+                   files_per_second=round(count / total, 2) if total > 0 else 0.0)]
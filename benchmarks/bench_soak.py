@@ -0,0 +1,82 @@
+
+# benchmarks/bench_soak.py
+import contextlib
+import gc
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.common import result
+
+
+def rss_bytes() -> Optional[int]:
+    """当前进程的常驻内存（RSS）"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def run(workdir: Path, files: int, checkpoints: int = 10,
+        max_growth: int = 16 * 1024 * 1024) -> List[Dict]:
+    """
+    长时间运行的内存测试：让 files 个不同路径的文件依次走一遍真实的处理流程
+    （哈希、记录缓存、剪贴板比对、图标恢复定时器），记录 RSS 的变化
+    以第一个检查点为基准，之后 RSS 增长超过 max_growth 即判定为不平稳
+    """
+    from config import Config
+    from main import EasyShaApp
+
+    folder = workdir / 'soak'
+    folder.mkdir(parents=True, exist_ok=True)
+    config = Config()
+    config.headless = True
+    config.download_folders = [str(folder)]
+    app = EasyShaApp(config)
+    app.notifications_enabled = False
+
+    step = max(1, files // checkpoints)
+    rss, samples = [], []
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        _soak(app, folder, files, step, rss, samples)
+    baseline = rss[0] if rss else None
+
+    app.timers.shutdown()
+
+    growth = (rss[-1] - baseline) if rss and baseline is not None else None
+    return [result('soak.process_file', {'files': files}, samples,
+                   rss_bytes=rss,
+                   rss_growth_bytes=growth,
+                   cached_records=len(app.records),
+                   stable=growth is not None and growth <= max_growth)]
+
+
+def _soak(app, folder: Path, files: int, step: int, rss: List, samples: List[float]):
+    """按 step 分段处理文件；samples 记录每段的平均单文件耗时，避免样本本身占用内存"""
+    elapsed = 0.0
+    for i in range(files):
+        path = folder / f"soak_{i}.bin"
+        data = i.to_bytes(8, 'little') * 64
+        path.write_bytes(data)
+
+        start = time.perf_counter()
+        app.on_file_detected(str(path))
+        if i % 10 == 0:
+            app.pending_verification = app.current_file
+            app.on_clipboard_hash(hashlib.sha256(data).hexdigest())
+        elapsed += time.perf_counter() - start
+        path.unlink()
+
+        if (i + 1) % step == 0:
+            samples.append(elapsed / step)
+            elapsed = 0.0
+            gc.collect()
+            rss.append(rss_bytes())
@@ -0,0 +1,95 @@
+
+# benchmarks/bench_startup.py
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.common import ROOT, result
+
+# 无界面启动时不应被加载的 UI 模块
+GUI_MODULES = ('win11toast', 'pystray', 'PIL', 'pyperclip')
+
+_IMPORT_CHECK = """
+import json, sys, time
+start = time.perf_counter()
+import main
+from config import Config
+config = Config()
+config.headless = True
+config.download_folders = [sys.argv[1]]
+main.EasyShaApp(config)
+print(json.dumps({
+    'seconds': time.perf_counter() - start,
+    'loaded': [m for m in %r if m in sys.modules],
+}))
+""" % (GUI_MODULES,)
+
+
+def _env():
+    env = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(ROOT), env.get('PYTHONPATH')]))
+    return env
+
+
+def _wait_for(lines: "queue.Queue[str]", marker: str, timeout: float) -> float:
+    deadline = time.perf_counter() + timeout
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise TimeoutError(f"等待输出 {marker!r} 超时")
+        try:
+            line = lines.get(timeout=remaining)
+        except queue.Empty:
+            continue
+        if marker in line:
+            return time.perf_counter()
+
+
+def run(workdir: Path, repeat: int, budget: float, timeout: float) -> List[Dict]:
+    """
+    测量无界面模式的启动开销：
+    - 导入 main 并构造 EasyShaApp 的耗时，以及是否误加载了 UI 库
+    - 从启动进程到开始监控、到第一个文件哈希完成的时间（与预算 budget 比较）
+    """
+    folder = workdir / 'watch_startup'
+    folder.mkdir(parents=True, exist_ok=True)
+
+    import_samples, loaded = [], set()
+    watch_samples, first_hash_samples = [], []
+    for i in range(repeat):
+        out = subprocess.run([sys.executable, '-c', _IMPORT_CHECK, str(folder)],
+                             cwd=str(ROOT), env=_env(), capture_output=True,
+                             text=True, timeout=timeout, check=True)
+        data = json.loads(out.stdout.strip().splitlines()[-1])
+        import_samples.append(data['seconds'])
+        loaded.update(data['loaded'])
+
+        spawned = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, str(ROOT / 'main.py'), '--headless', '--folder', str(folder)],
+            cwd=str(ROOT), env=_env(), stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, encoding='utf-8'
+        )
+        lines = queue.Queue()
+        threading.Thread(target=lambda: [lines.put(l) for l in proc.stdout], daemon=True).start()
+        try:
+            watch_samples.append(_wait_for(lines, '已开始监控', timeout) - spawned)
+            (folder / f"startup_{i}.bin").write_bytes(os.urandom(4096))
+            first_hash_samples.append(_wait_for(lines, '首个哈希完成', timeout) - spawned)
+        finally:
+            proc.kill()
+            proc.wait()
+
+    return [
+        result('startup.import_headless', {}, import_samples, gui_modules_loaded=sorted(loaded)),
+        result('startup.time_to_watch', {}, watch_samples),
+        result('startup.time_to_first_hash', {}, first_hash_samples,
+               budget_seconds=budget,
+               within_budget=max(first_hash_samples) <= budget),
+    ]
@@ -0,0 +1,53 @@
+
+# benchmarks/bench_watcher.py
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.utils.dirsnapshot import DirectorySnapshot
+
+from benchmarks.common import result
+from core.watchers import SmartPollingObserver
+
+
+def _populate(folder: Path, entries: int):
+    folder.mkdir(parents=True, exist_ok=True)
+    existing = sum(1 for _ in os.scandir(folder))
+    for i in range(existing, entries):
+        (folder / f"entry_{i:06d}.dat").touch()
+    # 把目录 mtime 调到过去，模拟一个早已稳定的下载目录
+    past = time.time() - 3600
+    os.utime(folder, (past, past))
+
+
+def _time(func, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(workdir: Path, entries: List[int], repeat: int) -> List[Dict]:
+    """
+    比较一次轮询的开销：
+    - watchdog PollingObserver 每次轮询都会构建完整的目录快照（stat 每个文件）
+    - SmartPollingObserver 在目录没有变化时只 stat 目录本身
+    """
+    results = []
+    for count in entries:
+        folder = workdir / f"watch_entries_{count}"
+        _populate(folder, count)
+        params = {'entries': count}
+
+        samples = _time(lambda: DirectorySnapshot(str(folder), recursive=False), repeat)
+        results.append(result('watcher.polling_tick', params, samples))
+
+        observer = SmartPollingObserver(full_scan_interval=0)
+        observer.schedule(FileSystemEventHandler(), str(folder))
+        samples = _time(observer.poll, repeat)
+        results.append(result('watcher.smart_polling_tick', params, samples))
+    return results
@@ -0,0 +1,123 @@
+
+# benchmarks/common.py
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 让 `python -m benchmarks.run` 能直接导入项目根目录下的 core/ 等模块
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+_UNITS = {'': 1, 'B': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+_BLOCK = 1024 * 1024
+
+
+def parse_size(text: str) -> int:
+    """把 4K / 64M / 2G 这样的写法转换为字节数"""
+    text = text.strip().upper().rstrip('B') or '0'
+    unit = text[-1] if text[-1] in _UNITS else ''
+    number = text[:-1] if unit else text
+    return int(float(number) * _UNITS[unit])
+
+
+def format_size(size: int) -> str:
+    """字节数转换为简短写法（用于文件名和结果）"""
+    for unit in ('B', 'K', 'M'):
+        if size < 1024 or size % 1024:
+            return f"{size}{unit}"
+        size //= 1024
+    return f"{size}G"
+
+
+def make_file(folder: Path, size: int, name: Optional[str] = None) -> Path:
+    """
+    生成指定大小的合成文件
+    同样大小的文件会被复用，避免每次都重新写入几个 GB 的数据
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / (name or f"synthetic_{format_size(size)}.bin")
+    if path.exists() and path.stat().st_size == size:
+        return path
+
+    block = os.urandom(min(size, _BLOCK))
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining > 0:
+            n = min(remaining, len(block))
+            f.write(block[:n])
+            remaining -= n
+    return path
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """计算一组耗时样本（秒）的统计值"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        'runs': len(ordered),
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'mean': statistics.mean(ordered),
+        'p95': p95,
+        'max': ordered[-1],
+    }
+
+
+def result(name: str, params: Dict, samples: List[float], **extra) -> Dict:
+    """构造一条机器可读的结果记录"""
+    record = {'name': name, 'params': params, 'stats': summarize(samples)}
+    record.update(extra)
+    return record
+
+
+def result_key(record: Dict) -> str:
+    """结果的唯一标识（名称 + 参数），用于和基线比对"""
+    return record['name'] + json.dumps(record['params'], sort_keys=True)
+
+
+def environment() -> Dict:
+    """记录运行环境，方便比较不同机器上的结果"""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def write_results(results: List[Dict], output: Optional[str]):
+    """输出 JSON 结果（未指定文件时写到标准输出）"""
+    payload = json.dumps({'environment': environment(), 'results': results},
+                         indent=2, ensure_ascii=False)
+    if output:
+        Path(output).write_text(payload, encoding='utf-8')
+    else:
+        print(payload)
+
+
+def compare(results: List[Dict], baseline_path: str, threshold: float) -> List[str]:
+    """
+    与基线结果比较中位数
+    返回超过阈值（例如 0.1 表示慢 10%）的回归描述
+    """
+    baseline = json.loads(Path(baseline_path).read_text(encoding='utf-8'))
+    old = {result_key(r): r['stats']['median'] for r in baseline.get('results', [])}
+
+    regressions = []
+    for record in results:
+        before = old.get(result_key(record))
+        after = record['stats']['median']
+        if before and after > before * (1 + threshold):
+            regressions.append(
+                f"{record['name']} {record['params']}: "
+                f"{before * 1000:.3f}ms -> {after * 1000:.3f}ms"
+            )
+    return regressions
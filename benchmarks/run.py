@@ -0,0 +1,107 @@
+
+# benchmarks/run.py
+"""
+EasySha 基准测试入口
+
+    python -m benchmarks.run                          # 默认规模，结果输出到终端
+    python -m benchmarks.run --large -o result.json   # 加入 1G/4G 文件
+    python -m benchmarks.run --baseline old.json      # 与基线比较，回归时返回非零
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks import bench_clipboard, bench_hash, bench_monitor, bench_soak, bench_startup, bench_watcher
+from benchmarks.common import compare, parse_size, write_results
+
+SUITES = ('hash', 'monitor', 'burst', 'clipboard', 'startup', 'watcher', 'soak')
+
+
+def _sizes(text: str):
+    return [parse_size(s) for s in text.split(',') if s]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="EasySha 基准测试")
+    parser.add_argument('--suite', action='append', choices=SUITES,
+                        help="只运行指定的测试，可重复（默认全部）")
+    parser.add_argument('--workdir', help="合成文件的存放目录（默认临时目录，同尺寸文件会复用）")
+    parser.add_argument('--sizes', type=_sizes, default=_sizes('4K,1M,64M'),
+                        help="哈希测试的文件大小，例如 4K,1M,64M")
+    parser.add_argument('--large', action='store_true', help="额外测试 1G 和 4G 文件")
+    parser.add_argument('--chunk-sizes', type=_sizes, default=_sizes('8K,64K,1M'),
+                        help="读取块大小，例如 8K,64K,1M")
+    parser.add_argument('--latency-sizes', type=_sizes, default=_sizes('4K,16M'),
+                        help="端到端延迟测试的文件大小")
+    parser.add_argument('--burst-count', type=int, default=50, help="突发下载的文件数")
+    parser.add_argument('--burst-size', type=parse_size, default=parse_size('1M'),
+                        help="突发下载中每个文件的大小")
+    parser.add_argument('--intervals', default='0.05,0.5',
+                        help="剪贴板轮询间隔（秒），逗号分隔")
+    parser.add_argument('--watch-entries', default='1000,20000',
+                        help="轮询测试中目录的条目数，逗号分隔")
+    parser.add_argument('--soak-files', type=int, default=100000,
+                        help="内存测试处理的文件数")
+    parser.add_argument('--startup-budget', type=float, default=1.5,
+                        help="无界面模式下从启动到首个哈希完成的时间预算（秒）")
+    parser.add_argument('--repeat', type=int, default=5, help="每项测试重复次数")
+    parser.add_argument('--timeout', type=float, default=60.0, help="等待单个结论的超时（秒）")
+    parser.add_argument('-o', '--output', help="结果 JSON 文件（默认输出到终端）")
+    parser.add_argument('--baseline', help="用于比较的基线 JSON 文件")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="判定为回归的中位数变慢比例（默认 0.10）")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    suites = args.suite or SUITES
+    sizes = args.sizes + (_sizes('1G,4G') if args.large else [])
+
+    tmp = None
+    if args.workdir:
+        workdir = Path(args.workdir)
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix='easysha-bench-')
+        workdir = Path(tmp.name)
+
+    results = []
+    try:
+        if 'hash' in suites:
+            results += bench_hash.run(workdir, sizes, args.chunk_sizes, args.repeat)
+        if 'monitor' in suites:
+            results += bench_monitor.run_latency(workdir, args.latency_sizes, args.repeat, args.timeout)
+        if 'burst' in suites:
+            results += bench_monitor.run_burst(workdir, args.burst_count, args.burst_size, args.timeout)
+        if 'clipboard' in suites:
+            intervals = [float(s) for s in args.intervals.split(',') if s]
+            results += bench_clipboard.run(intervals, args.repeat)
+        if 'watcher' in suites:
+            entries = [int(s) for s in args.watch_entries.split(',') if s]
+            results += bench_watcher.run(workdir, entries, args.repeat)
+        if 'soak' in suites:
+            results += bench_soak.run(workdir, args.soak_files)
+        if 'startup' in suites:
+            results += bench_startup.run(workdir, args.repeat, args.startup_budget, args.timeout)
+    finally:
+        if tmp:
+            tmp.cleanup()
+
+    write_results(results, args.output)
+
+    over_budget = [r['name'] for r in results
+                   if r.get('within_budget') is False or r.get('stable') is False]
+    for name in over_budget:
+        print(f"⚠️ 超出时间预算: {name}", file=sys.stderr)
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.threshold)
+        for line in regressions:
+            print(f"⚠️ 性能回归: {line}", file=sys.stderr)
+        return 1 if regressions or over_budget else 0
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
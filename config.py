@@ -1,16 +1,34 @@
 
 # config.py
-from dataclasses import dataclass
+import json
+import os
+from dataclasses import dataclass, field, fields
 from pathlib import Path
 
+from core.watchers import BACKENDS
 
+# 配置文件（JSON，可只写需要修改的字段）；运行中修改会自动重新加载
+CONFIG_FILE = Path(__file__).parent / "data" / "config.json"
+
+
+@dataclass
 class Config:
     """应用配置"""
-    # 监控的下载文件夹
-    download_folders: list = ["D:\\do"]
+    # 监控的下载文件夹，None 表示用户的下载文件夹
+    download_folders: list = None
+    
+    # 文件监控后端：auto / native / inotify / polling / smart_polling
+    # auto 会对网络共享（SMB/NFS）使用 smart_polling，本地文件夹使用系统原生通知
+    watcher_backend: str = "auto"
+    
+    # 按文件夹单独指定后端，例如 {"\\\\nas\\downloads": "smart_polling"}
+    watcher_backends: dict = field(default_factory=dict)
+    
+    # 轮询类后端的轮询间隔（秒）
+    polling_interval: float = 1.0
     
-    # 支持的文件扩展名
-    supported_extensions: list = None
+    # 只监控这些扩展名的文件，例如 [".iso", ".zip"]；空列表表示所有文件（校验和文件总是处理）
+    supported_extensions: list = field(default_factory=list)
     
     # 应用图标（可以是本地路径或网络图片）
     app_icon: str = "https://cdn-icons-png.flaticon.com/512/1006/1006772.png"
@@ -18,15 +36,88 @@ class Config:
     # 验证成功时的音效
     success_sound: str = "ms-winsoundevent:Notification.Looping.Alarm"
     
+    # 内存中最多保留的文件记录数（超出后淘汰最久未使用的）
+    max_cached_records: int = 1024
+    
+    # 先于下载完成复制的剪贴板哈希保留多久（秒），以及最多保留多少个
+    expectation_ttl: float = 1800.0
+    max_expectations: int = 256
+    
+    # 同时边下载边计算哈希的临时文件数
+    max_incremental_files: int = 16
+    
+    # 批量校验（SHA256SUMS 等）时并发计算哈希的线程数
+    verify_workers: int = 4
+    
+    # 每个磁盘设备上同时计算哈希的文件数（机械硬盘建议保持 1）
+    io_concurrency_per_device: int = 1
+    
+    # 哈希读取的总速率上限（字节/秒），0 表示不限速
+    io_bytes_per_second: int = 0
+    
+    # 读取后释放页缓存（posix_fadvise，仅支持的平台生效）
+    io_drop_cache: bool = True
+    
+    # 本地 IPC 服务（供其他工具查询摘要、请求计算哈希）
+    ipc_enabled: bool = False
+    
+    # IPC 地址：unix:/path/to.sock 或 tcp:127.0.0.1:48321，None 表示按平台选择默认值
+    ipc_address: str = None
+    
+    # 事件记录文件（JSON Lines），None 表示不记录
+    trace_file: str = None
+    
+    # 无界面模式（服务器/批处理）：不加载托盘、Toast 和剪贴板相关库
+    headless: bool = False
+    
+    # 检查配置文件是否修改的间隔（秒），0 表示不自动重新加载
+    config_reload_interval: float = 2.0
+    
     def __post_init__(self):
         if self.download_folders is None:
             # 默认监控用户的下载文件夹
             self.download_folders = [str(Path.home() / "Downloads")]
+    
+    @classmethod
+    def load(cls, path=CONFIG_FILE) -> "Config":
+        """从 JSON 文件加载配置，文件中没有的字段使用默认值；文件不存在时返回默认配置"""
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError(f"配置文件格式错误: {path}")
         
-        if self.supported_extensions is None:
-            # 常见需要校验的文件类型
-            self.supported_extensions = [
-                '.iso', '.exe', '.msi', '.zip', '.rar', '.7z',
-                '.tar', '.gz', '.bz2', '.xz', '.dmg', '.img',
-                '.apk', '.ova', '.vhd', '.bin'
-            ]
\ No newline at end of file
+        types = {f.name: f.type for f in fields(cls)}
+        for key in data.keys() - types.keys():
+            print(f"忽略未知的配置项: {key}")
+        values = {k: v for k, v in data.items() if k in types}
+        for key, value in values.items():
+            _check_type(key, value, types[key])
+        for folder in values.get('download_folders') or ():
+            if not os.path.isabs(folder):
+                raise ValueError(f"download_folders 必须是绝对路径: {folder}")
+        backends = [values.get('watcher_backend')] + list((values.get('watcher_backends') or {}).values())
+        for backend in backends:
+            if backend is not None and backend not in BACKENDS:
+                raise ValueError(f"不支持的监控后端: {backend}（可选 {', '.join(BACKENDS)}）")
+        return cls(**values)
+
+
+def _check_type(key: str, value, expected: type):
+    """配置文件中的值必须与字段类型一致（None 表示使用默认值；列表和字典的元素必须是字符串）"""
+    if value is None:
+        return
+    if expected is float:
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif expected is int:
+        ok = isinstance(value, int) and not isinstance(value, bool)
+    elif expected is list:
+        ok = isinstance(value, list) and all(isinstance(v, str) for v in value)
+    elif expected is dict:
+        ok = isinstance(value, dict) and all(isinstance(v, str) for v in value.values())
+    else:
+        ok = isinstance(value, expected)
+    if not ok:
+        raise ValueError(f"配置项 {key} 的类型应为 {expected.__name__}: {value!r}")
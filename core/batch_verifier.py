@@ -0,0 +1,94 @@
+
+# core/batch_verifier.py
+import hmac
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from core.checksums import ChecksumEntry, iter_checksum_entries
+from core.records import FileRecord
+
+
+class BatchResult:
+    """一次批量校验的汇总结果（只保存文件名）"""
+    __slots__ = ("checksum_file", "passed", "failed", "missing", "pending")
+
+    def __init__(self, checksum_file: str):
+        self.checksum_file = checksum_file
+        self.passed: List[str] = []
+        self.failed: List[str] = []
+        self.missing: List[str] = []
+        # 目录内尚不存在（可能还在下载）的文件：(解析后的完整路径, 条目)
+        self.pending: List[Tuple[str, ChecksumEntry]] = []
+
+    @property
+    def checked(self) -> bool:
+        """是否至少校验了一个文件"""
+        return bool(self.passed or self.failed)
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.passed) and not self.failed
+
+
+class BatchVerifier:
+    """根据校验和文件，并发校验同目录下引用的所有文件"""
+
+    def __init__(self, get_record: Callable[[str], Optional[FileRecord]], max_workers: int = 4):
+        self.get_record = get_record  # 获取文件记录（优先使用缓存中的摘要）
+        self.max_workers = max_workers
+        self._executor = None
+
+    def verify(self, checksum_path: str) -> BatchResult:
+        """解析校验和文件并校验其中引用的、当前已存在的文件"""
+        folder = Path(checksum_path).resolve().parent
+        result = BatchResult(checksum_path)
+        futures = []
+        pool = self._pool()
+
+        for entry in iter_checksum_entries(checksum_path):
+            name = entry.filename
+            target = (folder / name).resolve()
+            # 只校验校验和文件所在目录（及其子目录）中的文件
+            if folder not in target.parents:
+                result.missing.append(name)
+                continue
+            if not target.is_file():
+                result.missing.append(name)
+                result.pending.append((str(target), entry))
+                continue
+            futures.append((name, entry, pool.submit(self.get_record, str(target))))
+
+        for name, entry, future in futures:
+            try:
+                record = future.result()
+            except Exception as e:
+                print(f"校验 {name} 出错: {e}")
+                record = None
+            actual = record.digest(entry.algorithm) if record else None
+            if actual and hmac.compare_digest(actual, entry.digest):
+                result.passed.append(name)
+            else:
+                result.failed.append(name)
+        return result
+
+    def resize(self, max_workers: int):
+        """
+        调整线程数：之后的校验使用新的线程池
+        旧线程池不主动关闭，正在进行的校验继续使用它，完成后随引用释放而退出
+        """
+        if max_workers != self.max_workers:
+            self.max_workers = max_workers
+            self._executor = None
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="EasySha-Verify"
+            )
+        return self._executor
@@ -0,0 +1,59 @@
+
+# core/cache.py
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """线程安全的定长缓存，超出容量时淘汰最久未使用的条目"""
+
+    def __init__(self, maxsize: int = 1024, on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.maxsize = maxsize
+        self.on_evict = on_evict  # 条目被淘汰时的回调，用于同步清理索引
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def resize(self, maxsize: int):
+        """调整容量，缩小时立即淘汰多余条目"""
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def values(self):
+        with self._lock:
+            return list(self._data.values())
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _evict(self):
+        while len(self._data) > self.maxsize:
+            key, value = self._data.popitem(last=False)
+            if self.on_evict:
+                self.on_evict(key, value)
@@ -0,0 +1,95 @@
+
+# core/checksums.py
+import re
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+from core.digests import DIGEST_SIZES
+
+# 各摘要长度（十六进制字符数）对应的算法
+_LENGTH_ALGORITHMS = {size * 2: algorithm for size, algorithm in DIGEST_SIZES.items()}
+
+# SHA256SUMS、MD5SUMS.asc、Fedora-xxx-CHECKSUM、xxx.iso.sha256、xxx.md5 ...
+_NAME_PATTERN = re.compile(
+    r'(^(sha1|sha256|sha512|md5)sums(\.txt)?'
+    r'|checksums?(\.txt)?'
+    r'|\.(sha1|sha256|sha512|md5)(sum)?)'
+    r'(\.(asc|sig|gpg))?$',
+    re.IGNORECASE
+)
+
+# GNU coreutils 格式："<hash>  <文件名>" 或 "<hash> *<文件名>"
+_GNU_LINE = re.compile(r'^([0-9a-fA-F]{32,128})\s+\*?(.+)$')
+
+# BSD 格式："SHA256 (<文件名>) = <hash>"
+_BSD_LINE = re.compile(r'^([A-Za-z0-9-]+)\s*\((.+)\)\s*=\s*([0-9a-fA-F]{32,128})$')
+
+# 只有一个哈希值（xxx.iso.sha256 常见写法）
+_BARE_LINE = re.compile(r'^([0-9a-fA-F]{32,128})$')
+
+
+class ChecksumEntry(NamedTuple):
+    """校验文件中的一行：算法、摘要（bytes）和相对文件名"""
+    algorithm: str
+    digest: bytes
+    filename: str
+
+
+def is_checksum_file(file_path: str) -> bool:
+    """根据文件名判断是否为校验和文件"""
+    return _NAME_PATTERN.search(Path(file_path).name) is not None
+
+
+def _bare_target(name: str) -> str:
+    """xxx.iso.sha256(.asc) -> xxx.iso"""
+    stem = re.sub(r'\.(asc|sig|gpg)$', '', name, flags=re.IGNORECASE)
+    return re.sub(r'\.(sha1|sha256|sha512|md5)(sum)?$', '', stem, flags=re.IGNORECASE)
+
+
+def iter_checksum_entries(file_path: str) -> Iterator[ChecksumEntry]:
+    """
+    逐行解析校验和文件（不会一次性读入内存）
+    支持 GNU / BSD 两种格式、只有哈希值的单文件格式，以及 GPG 明文签名包裹的内容。
+    注意：这里只提取签名中的内容，不验证 GPG 签名本身。
+    """
+    path = Path(file_path)
+    in_signed_header = False
+
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for raw in f:
+            line = raw.strip()
+
+            # GPG 明文签名：跳过头部（直到空行），遇到签名块即结束
+            if line == '-----BEGIN PGP SIGNED MESSAGE-----':
+                in_signed_header = True
+                continue
+            if in_signed_header:
+                in_signed_header = bool(line)
+                continue
+            if line == '-----BEGIN PGP SIGNATURE-----':
+                break
+            if line.startswith('- '):
+                line = line[2:]  # dash-escaped 行
+
+            if not line or line.startswith('#'):
+                continue
+
+            match = _BSD_LINE.match(line)
+            if match:
+                algorithm, filename, digest = match.group(1).lower().replace('-', ''), match.group(2), match.group(3)
+            else:
+                match = _GNU_LINE.match(line)
+                if match:
+                    digest, filename = match.group(1), match.group(2).strip()
+                    algorithm = None
+                else:
+                    match = _BARE_LINE.match(line)
+                    if not match:
+                        continue
+                    digest, filename, algorithm = match.group(1), _bare_target(path.name), None
+
+            by_length = _LENGTH_ALGORITHMS.get(len(digest))
+            if by_length is None or (algorithm and algorithm != by_length):
+                continue  # 长度与算法对不上，或是不支持的算法（如 sha384 / b2）
+            algorithm = by_length
+            yield ChecksumEntry(algorithm, bytes.fromhex(digest), filename)
@@ -1,27 +1,37 @@
 
 # core/clipboard_monitor.py
-import pyperclip
 import time
-import re
 from typing import Optional, Callable
+from core.digests import normalize_digest
 
 class ClipboardMonitor:
     """监控剪贴板中的哈希值"""
     
-    def __init__(self):
+    def __init__(self, paste: Optional[Callable[[], str]] = None, interval: float = 0.5):
+        self.paste = paste  # 读取剪贴板的函数，可替换（基准测试用）；默认在启动时才加载 pyperclip
+        self.interval = interval
         self.last_content = ""
+        self.own_content = None  # 本程序自己写入剪贴板的内容（复制哈希按钮），不当作用户复制的校验和
         self.running = False
         self.callback = None
-        # 匹配常见的哈希值格式（十六进制字符串）
-        self.hash_pattern = re.compile(r'^[a-fA-F0-9]{32,}$')  # 32位以上十六进制
     
     def start(self, callback):
         """开始监控剪贴板"""
         self.app= callback
         self.running = True
-        self.last_content = pyperclip.paste()
+        if self.paste is None:
+            import pyperclip
+            self.paste = pyperclip.paste
+        self.last_content = self.paste()
         self._monitor()
     
+    def copy(self, text: str):
+        """写入剪贴板（先记下内容，轮询线程看到时不会触发比对）"""
+        import pyperclip
+        self.own_content = text
+        self.last_content = text
+        pyperclip.copy(text)
+    
     def stop(self):
         """停止监控"""
         self.running = False
@@ -31,23 +41,28 @@ class ClipboardMonitor:
         while self.running:
             try:
 
-                current = pyperclip.paste()
+                current = self.paste()
                 if current != self.last_content:
                     self.last_content = current
-                    # 检查是否可能是哈希值
-                    if self._is_hash(current):
+                    # 检查是否可能是哈希值（忽略本程序自己复制的）
+                    if not self._is_own(current) and self._is_hash(current):
                         self.app(current)
-                time.sleep(0.5)  # 每500ms检查一次1ee648ad4961ef19484e063c96784634841990ef45ece1e03dff4fe9d6747d4d
+                time.sleep(self.interval)  # 默认每500ms检查一次
             except Exception as e:
                 print(f"剪贴板监控出错: {e}")
                 import traceback
                 traceback.print_exc()
                 time.sleep(1)
     
+    def _is_own(self, text: str) -> bool:
+        """剪贴板内容是否为本程序写入的（系统可能附加换行等空白）；出现其他内容后不再忽略"""
+        if self.own_content is not None and isinstance(text, str) and text.strip() == self.own_content.strip():
+            return True
+        self.own_content = None
+        return False
+    
     def _is_hash(self, text: str) -> bool:
         """判断文本是否可能是哈希值"""
-        if not text or not isinstance(text, str):
-            return False
-        text = text.strip()
         # 常见的哈希长度：MD5=32, SHA1=40, SHA256=64, SHA512=128
-        return len(text) in [64] and self.hash_pattern.match(text) is not None
\ No newline at end of file
+        # 也接受通知中显示的截断形式（至少 16 位，以 ... 或 … 结尾）
+        return normalize_digest(text) is not None
\ No newline at end of file
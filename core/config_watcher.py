@@ -0,0 +1,66 @@
+
+# core/config_watcher.py
+import os
+from typing import Callable, Optional, Tuple
+
+
+class ConfigWatcher:
+    """
+    定时检查配置文件的修改时间和大小，变化后重新加载并回调
+    检查在 TimerPool 的定时线程中进行，不需要额外的线程；
+    加载或应用失败（如 JSON 写到一半）时保留当前配置，之后每次检查都会重试，直到成功应用
+    """
+
+    def __init__(self, path: str, timers, loader: Callable, on_change: Callable, interval: float = 2.0):
+        self.path = path
+        self.timers = timers
+        self.loader = loader        # 无参数，返回新的 Config
+        self.on_change = on_change  # 接收新的 Config
+        self.interval = interval
+        self._signature = None  # 最后一次成功应用时的文件签名
+        self._failed = None     # 最后一次失败时的文件签名（同一文件重试失败时不重复输出）
+        self._handle = None
+
+    def start(self):
+        self._signature = self._stat()
+        self._schedule()
+
+    def stop(self):
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+
+    def check(self):
+        """配置文件有变化时重新加载，返回是否已应用新配置"""
+        signature = self._stat()
+        if signature == self._signature:
+            return False
+        try:
+            config = self.loader()
+            print("🔄 配置文件已修改，正在应用...")
+            self.on_change(config)
+        except (OSError, ValueError, TypeError) as e:
+            if signature != self._failed:
+                print(f"重新加载配置失败，继续使用当前配置: {e}")
+            self._failed = signature
+            return False
+        self._signature = signature
+        self._failed = None
+        return True
+
+    def _schedule(self):
+        self._handle = self.timers.call_later(self.interval, self._tick)
+
+    def _tick(self):
+        try:
+            self.check()
+        finally:
+            if self._handle:
+                self._schedule()
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
@@ -0,0 +1,172 @@
+
+# core/digests.py
+import bisect
+import hmac
+import re
+import threading
+from typing import Dict, List, Optional
+
+from core.records import ALGORITHMS, FileRecord
+
+# 摘要字节数 -> 算法
+DIGEST_SIZES = {16: "md5", 20: "sha1", 32: "sha256", 64: "sha512"}
+# 截断的摘要（如通知中显示的 abcd1234...）至少要有的十六进制位数
+MIN_PREFIX_HEX = 16
+
+_HEX = re.compile(r'[0-9a-fA-F]+')
+_ELLIPSIS = ('...', '…')
+
+
+class DigestQuery:
+    """
+    规范化后的摘要：完整摘要，或用户粘贴的截断前缀
+    十六进制文本只在输入时解析一次，之后都以原始 bytes 比较
+    """
+    __slots__ = ("value", "partial", "nibble", "text")
+
+    def __init__(self, value: bytes, partial: bool = False, nibble: Optional[int] = None, text: str = ""):
+        self.value = value        # 完整摘要，或前缀中完整的字节
+        self.partial = partial
+        self.nibble = nibble      # 前缀为奇数位时最后半个字节
+        self.text = text or value.hex()
+
+    @property
+    def algorithm(self) -> Optional[str]:
+        """完整摘要按长度确定算法；前缀无法确定"""
+        return None if self.partial else DIGEST_SIZES.get(len(self.value))
+
+    def matches(self, digest: Optional[bytes]) -> bool:
+        """常数时间比较（前缀只比较前缀部分）"""
+        if not digest:
+            return False
+        if not self.partial:
+            return hmac.compare_digest(digest, self.value)
+        n = len(self.value)
+        if len(digest) < n or not hmac.compare_digest(digest[:n], self.value):
+            return False
+        if self.nibble is None:
+            return True
+        return len(digest) > n and digest[n] >> 4 == self.nibble
+
+    def __repr__(self) -> str:
+        return f"DigestQuery({self.text}{'...' if self.partial else ''})"
+
+
+def normalize_digest(text: str) -> Optional[DigestQuery]:
+    """
+    把剪贴板、IPC 请求等输入的十六进制摘要转换为 DigestQuery，不是摘要时返回 None
+    接受 MD5/SHA1/SHA256/SHA512 的完整长度，以及以 ... 或 … 结尾、至少 16 位的前缀
+    """
+    if not text or not isinstance(text, str):
+        return None
+    text = text.strip()
+    partial = text.endswith(_ELLIPSIS)
+    if partial:
+        text = text.rstrip('.…').rstrip()
+    if not _HEX.fullmatch(text):
+        return None
+    text = text.lower()
+
+    if not partial:
+        if len(text) // 2 not in DIGEST_SIZES or len(text) % 2:
+            return None
+        return DigestQuery(bytes.fromhex(text), text=text)
+
+    if not MIN_PREFIX_HEX <= len(text) < max(DIGEST_SIZES) * 2:
+        return None
+    even = len(text) - len(text) % 2
+    nibble = int(text[even], 16) if even < len(text) else None
+    return DigestQuery(bytes.fromhex(text[:even]), True, nibble, text)
+
+
+def match_record(record: FileRecord, query: DigestQuery) -> Optional[str]:
+    """记录的某个摘要与 query 一致时返回该算法"""
+    algorithm = query.algorithm
+    if algorithm:
+        return algorithm if query.matches(record.digest(algorithm)) else None
+    for algorithm in ALGORITHMS:
+        if query.matches(record.digest(algorithm)):
+            return algorithm
+    return None
+
+
+class DigestTable:
+    """
+    摘要 -> 文件记录的索引（与 records 缓存同步维护）
+    完整摘要按字典精确查找；前缀查找在按需排序的摘要列表上二分，
+    bytes 的比较都在 C 层完成，插入只需 O(1)，排序推迟到第一次前缀查询
+    """
+
+    def __init__(self):
+        self._by_digest: Dict[bytes, List[FileRecord]] = {}
+        self._by_path: Dict[str, FileRecord] = {}
+        self._sorted: List[bytes] = []
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def add(self, record: FileRecord):
+        """加入记录（同一路径的旧记录会被替换）"""
+        with self._lock:
+            old = self._by_path.get(record.path)
+            if old is record:
+                return
+            if old is not None:
+                self._remove(old)
+            self._by_path[record.path] = record
+            for algorithm in ALGORITHMS:
+                digest = record.digest(algorithm)
+                if not digest:
+                    continue
+                records = self._by_digest.get(digest)
+                if records is None:
+                    self._by_digest[digest] = [record]
+                    self._dirty = True
+                else:
+                    records.append(record)
+
+    def discard(self, record: FileRecord):
+        """移除记录（只有当前索引中的正是这条记录时才移除）"""
+        with self._lock:
+            if self._by_path.get(record.path) is record:
+                self._remove(record)
+
+    def lookup(self, query: DigestQuery) -> List[FileRecord]:
+        """查找与 query 匹配的记录，最近加入的在最后"""
+        with self._lock:
+            if not query.partial:
+                return list(self._by_digest.get(query.value, ()))
+
+            if self._dirty:
+                self._sorted = sorted(self._by_digest)
+                self._dirty = False
+            matches = []
+            index = bisect.bisect_left(self._sorted, query.value)
+            while index < len(self._sorted) and self._sorted[index].startswith(query.value):
+                digest = self._sorted[index]
+                if query.matches(digest):
+                    matches.extend(self._by_digest[digest])
+                index += 1
+            return matches
+
+    def clear(self):
+        with self._lock:
+            self._by_digest.clear()
+            self._by_path.clear()
+            self._sorted = []
+            self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._by_path)
+
+    def _remove(self, record: FileRecord):
+        del self._by_path[record.path]
+        for algorithm in ALGORITHMS:
+            digest = record.digest(algorithm)
+            records = self._by_digest.get(digest) if digest else None
+            if not records:
+                continue
+            if record in records:
+                records.remove(record)
+            if not records:
+                del self._by_digest[digest]
+                self._dirty = True
@@ -0,0 +1,77 @@
+
+# core/expectations.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from core.digests import DigestQuery, match_record
+from core.records import ALGORITHMS, FileRecord
+
+
+class ExpectationTable:
+    """
+    尚未找到对应文件的剪贴板哈希（期望值）
+    以原始摘要为键，每个新计算出的文件记录只需按算法各查一次字典（O(1)）；
+    截断的前缀（数量很少）逐个比较；
+    条目在 ttl 秒后过期，超过 maxsize 时淘汰最早加入的条目
+    """
+
+    def __init__(self, ttl: float = 1800.0, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # 完整摘要 bytes 或前缀文本 -> (过期时间, 原始文本, DigestQuery)
+        self._partial = 0  # 其中前缀条目的数量
+        self._lock = threading.Lock()
+
+    def add(self, query: DigestQuery, text: str):
+        """记录一个期望的摘要（重复添加会刷新过期时间）"""
+        key = query.text if query.partial else query.value
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, text, query)
+            self._partial += query.partial
+            self._purge()
+            while len(self._entries) > self.maxsize:
+                self._pop(next(iter(self._entries)))
+
+    def match(self, record: FileRecord) -> Optional[str]:
+        """若记录的任一摘要在表中，则移除该条目并返回剪贴板原文"""
+        with self._lock:
+            self._purge()
+            if not self._entries:
+                return None
+            for algorithm in ALGORITHMS:
+                digest = record.digest(algorithm)
+                entry = self._pop(digest) if digest else None
+                if entry:
+                    return entry[1]
+            if self._partial:
+                for key, (_, text, query) in self._entries.items():
+                    if query.partial and match_record(record, query):
+                        self._pop(key)
+                        return text
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._partial = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _purge(self):
+        """条目按加入顺序排列（ttl 相同），从头部移除已过期的即可"""
+        now = time.monotonic()
+        while self._entries:
+            key, (expires, _, _) = next(iter(self._entries.items()))
+            if expires > now:
+                break
+            self._pop(key)
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._partial -= entry[2].partial
+        return entry
@@ -2,28 +2,61 @@
 # core/file_monitor.py
 import time
 from pathlib import Path
-from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from typing import Callable, List
+from typing import Callable, Dict, List, Optional
+from core.watchers import create_observer, resolve_backend
+from core.checksums import is_checksum_file
+
+# 下载中的临时文件
+TEMP_MARKERS = (".tmp", ".crdownload", ".part")
+
+# 浏览器顺序追加写入的临时文件，可以边下载边计算哈希
+APPEND_ONLY_MARKERS = (".crdownload", ".part")
+
+
+def _is_temp(file_path: str, markers=TEMP_MARKERS) -> bool:
+    return any(file_path.find(m) != -1 for m in markers)
+
 
 class DownloadHandler(FileSystemEventHandler):
     """处理下载文件夹的事件"""
     
-    def __init__(self, on_file_complete: Callable):
+    def __init__(self, on_file_complete: Callable, on_checksum_file: Optional[Callable] = None,
+                 on_partial: Optional[Callable] = None, on_partial_renamed: Optional[Callable] = None,
+                 recorder=None, should_monitor: Optional[Callable[[str], bool]] = None):
         self.on_file_complete = on_file_complete
+        self.on_checksum_file = on_checksum_file  # 校验和文件（SHA256SUMS、*.sha256 等）的回调
+        self.on_partial = on_partial              # 下载中的临时文件有新数据
+        self.on_partial_renamed = on_partial_renamed  # 临时文件重命名为正式文件（下载完成）
+        self.recorder = recorder                  # TraceRecorder，记录事件用于回放
+        self.should_monitor = should_monitor      # 按扩展名过滤（校验和文件不受影响）
         self.processing_files = set()
     
+    def dispatch(self, event):
+        if self.recorder:
+            self.recorder.record_fs(event)
+        super().dispatch(event)
+    
     def on_modified(self, event):
         if not event.is_directory:
             self._handle_file(event.src_path)
     
+    def on_moved(self, event):
+        """浏览器下载完成时会把临时文件重命名为正式文件名"""
+        if event.is_directory or _is_temp(event.dest_path):
+            return
+        if self.on_partial_renamed and _is_temp(event.src_path, APPEND_ONLY_MARKERS):
+            self.on_partial_renamed(event.src_path, event.dest_path)
+        self._handle_file(event.dest_path)
+    
     def _handle_file(self, file_path: str):
         """处理新文件/修改的文件"""
         # 检查文件是否存在且稳定（大小不再变化）
         path = Path(file_path)
-        for i in (".tmp", ".crdownload",".part"):
-            if file_path.find(i) != -1:
-                return
+        if _is_temp(file_path):
+            if self.on_partial and _is_temp(file_path, APPEND_ONLY_MARKERS):
+                self.on_partial(file_path)
+            return
 
         if not path.exists() or  file_path in self.processing_files:
             return
@@ -31,38 +64,121 @@ class DownloadHandler(FileSystemEventHandler):
         self.processing_files.add(file_path)
         
         try:
-            self.on_file_complete(file_path)
+            if self.on_checksum_file and is_checksum_file(file_path):
+                self.on_checksum_file(file_path)
+            elif self.should_monitor is None or self.should_monitor(file_path):
+                self.on_file_complete(file_path)
         finally:
             self.processing_files.remove(file_path)
 
 class FileMonitor:
     """监控下载文件夹"""
     
-    def __init__(self, folders: List[str], supported_extensions: List[str]):
-        self.folders = folders
-        self.supported_extensions = supported_extensions
-        self.observer = Observer()
+    def __init__(self, folders: List[str], supported_extensions: List[str],
+                 backend: str = "auto", backends: Optional[Dict[str, str]] = None,
+                 polling_interval: float = 1.0, recorder=None):
+        self.folders = list(folders)
+        self.backend = backend              # 默认后端
+        self.backends = backends or {}      # 按文件夹单独指定的后端
+        self.polling_interval = polling_interval
+        self.recorder = recorder
+        self.observers = {}                 # 后端名称 -> observer，同一后端的文件夹共用一个
+        self.watches = {}                   # 文件夹 -> (后端名称, watch)
         self.handler = None
+        self._started = False
+        self.set_extensions(supported_extensions)
     
-    def start(self, on_file_detected: Callable):
+    def start(self, on_file_detected: Callable, on_checksum_file: Optional[Callable] = None,
+              on_partial: Optional[Callable] = None, on_partial_renamed: Optional[Callable] = None):
         """开始监控文件夹"""
-        self.handler = DownloadHandler(on_file_detected)
+        self.handler = DownloadHandler(on_file_detected, on_checksum_file,
+                                       on_partial, on_partial_renamed, self.recorder,
+                                       self._should_monitor)
         
         for folder in self.folders:
-            folder_path = Path(folder)
-            if not folder_path.exists():
-                folder_path.mkdir(parents=True, exist_ok=True)
-            
-            self.observer.schedule(self.handler, str(folder_path), recursive=False)
-            print(f"监控文件夹: {folder}")
+            self._schedule(folder)
+        
+        for observer in self.observers.values():
+            observer.start()
+        self._started = True
+    
+    def update(self, folders: List[str], backend: Optional[str] = None,
+               backends: Optional[Dict[str, str]] = None):
+        """
+        应用新的文件夹列表和后端设置：只移除/添加有变化的文件夹，其余文件夹的监控不受影响
+        新增的文件夹必须是已存在的绝对路径（不会像启动时那样自动创建）
+        """
+        backend = self.backend if backend is None else backend
+        backends = self.backends if backends is None else backends
+        if not self._started:
+            self.folders = list(folders)
+            self.backend, self.backends = backend, backends
+            return
+        
+        # 先创建新设置需要的 observer：后端无效时在改动任何监控之前报错，当前监控保持不变
+        for name in {resolve_backend(f, backends.get(f, backend)) for f in folders}:
+            self._observer(name)
+        self.backend, self.backends = backend, backends
         
-        self.observer.start()
+        for folder in list(self.watches):
+            if folder not in folders or self._backend_for(folder) != self.watches[folder][0]:
+                self._unschedule(folder)
+        for folder in folders:
+            if folder in self.watches:
+                continue
+            if not Path(folder).is_absolute() or not Path(folder).is_dir():
+                print(f"跳过不存在的文件夹（需要绝对路径）: {folder}")
+                continue
+            self._schedule(folder, create=False)
+        self.folders = list(folders)
+    
+    def set_extensions(self, supported_extensions: Optional[List[str]]):
+        """重建扩展名匹配（空列表或 None 表示监控所有文件）"""
+        self.supported_extensions = supported_extensions
+        self._extensions = tuple(ext.lower() for ext in supported_extensions or ())
+    
+    def set_polling_interval(self, interval: float):
+        """调整轮询间隔（smart_polling 立即生效，watchdog 的 PollingObserver 只影响之后创建的）"""
+        self.polling_interval = interval
+        for observer in self.observers.values():
+            if hasattr(observer, 'interval'):
+                observer.interval = interval
     
     def stop(self):
         """停止监控"""
-        self.observer.stop()
-        self.observer.join()
+        for observer in self.observers.values():
+            observer.stop()
+        for observer in self.observers.values():
+            observer.join()
+    
+    def _backend_for(self, folder: str) -> str:
+        return resolve_backend(folder, self.backends.get(folder, self.backend))
+    
+    def _schedule(self, folder: str, create: bool = True):
+        folder_path = Path(folder)
+        if create and not folder_path.exists():
+            folder_path.mkdir(parents=True, exist_ok=True)
+        
+        backend = self._backend_for(folder)
+        observer = self._observer(backend)
+        watch = observer.schedule(self.handler, str(folder_path), recursive=False)
+        self.watches[folder] = (backend, watch)
+        print(f"监控文件夹: {folder} ({backend})")
+    
+    def _observer(self, backend: str):
+        """获取后端对应的 observer，没有时创建（已开始监控时立即启动）"""
+        observer = self.observers.get(backend)
+        if observer is None:
+            observer = self.observers[backend] = create_observer(backend, self.polling_interval)
+            if self._started:
+                observer.start()
+        return observer
+    
+    def _unschedule(self, folder: str):
+        backend, watch = self.watches.pop(folder)
+        self.observers[backend].unschedule(watch)
+        print(f"停止监控文件夹: {folder}")
     
     def _should_monitor(self, file_path: str) -> bool:
         """检查文件类型是否需要监控"""
-        return any(file_path.lower().endswith(ext) for ext in self.supported_extensions)
\ No newline at end of file
+        return not self._extensions or file_path.lower().endswith(self._extensions)
@@ -1,14 +1,22 @@
 
 # core/hash_calculator.py
 import hashlib
+import os
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
+from core.records import FileRecord
+
+# 每读取这么多字节，就告诉内核丢弃已读部分的页缓存
+_DONTNEED_WINDOW = 8 * 1024 * 1024
 
 class HashCalculator:
     """计算文件哈希值的服务"""
     
-    def __init__(self, algorithm: str = "sha256"):
+    def __init__(self, algorithm: str = "sha256", drop_cache: bool = True):
         self.algorithm = algorithm
+        # 支持 posix_fadvise 的平台上，提示内核顺序读取并在读完后释放页缓存，
+        # 避免哈希一个大文件就把其他程序的缓存挤掉
+        self.drop_cache = drop_cache and hasattr(os, 'posix_fadvise')
         self._hash_funcs = {
             "md5": hashlib.md5,
             "sha1": hashlib.sha1,
@@ -21,30 +29,81 @@ class HashCalculator:
         计算文件的哈希值
         返回包含多种哈希算法的字典
         """
-        file_path = Path(file_path)
+        hashes = self._digest(Path(file_path), chunk_size)
+        if hashes is None:
+            return None
+        
+        # 返回十六进制结果
+        return {name: h.hexdigest() for name, h in hashes.items()}
+    
+    def calculate_record(self, file_path: str, chunk_size: int = 8192,
+                         throttle: Optional[Callable[[int], None]] = None) -> Optional[FileRecord]:
+        """计算所有哈希并返回 FileRecord（摘要以 bytes 保存）"""
+        path = Path(file_path)
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        
+        hashes = self._digest(path, chunk_size, throttle)
+        if hashes is None:
+            return None
+        
+        return FileRecord(
+            str(file_path), path.name, st.st_size, st.st_mtime_ns,
+            {name: h.digest() for name, h in hashes.items()}
+        )
+    
+    def new_hashes(self) -> dict:
+        """为所有支持的算法创建新的哈希对象"""
+        return {name: func() for name, func in self._hash_funcs.items()}
+    
+    def _digest(self, file_path: Path, chunk_size: int,
+                throttle: Optional[Callable[[int], None]] = None):
+        """
+        一次读取文件，同时更新所有哈希对象
+        throttle 在每读取一块后调用（由 IOScheduler 提供，用于限速和让出带宽）
+        """
         if not file_path.exists() or not file_path.is_file():
             return None
         
         # 初始化所有哈希对象
-        hashes = {name: func() for name, func in self._hash_funcs.items()}
+        hashes = self.new_hashes()
         
         try:
             with open(file_path, 'rb') as f:
+                fd = f.fileno()
+                self.fadvise(fd, 0, 0, 'POSIX_FADV_SEQUENTIAL')
+                offset = dropped = 0
                 while True:
                     chunk = f.read(chunk_size)
                     if not chunk:
                         break
                     for h in hashes.values():
                         h.update(chunk)
-            
-            # 返回十六进制结果
-            return {name: h.hexdigest() for name, h in hashes.items()}
+                    offset += len(chunk)
+                    if offset - dropped >= _DONTNEED_WINDOW:
+                        self.fadvise(fd, dropped, offset - dropped, 'POSIX_FADV_DONTNEED')
+                        dropped = offset
+                    if throttle:
+                        throttle(len(chunk))
+                self.fadvise(fd, dropped, 0, 'POSIX_FADV_DONTNEED')
+            return hashes
         
         except (IOError, PermissionError) as e:
             print(f"读取文件出错 {file_path}: {e}")
             return None
     
-    def calculate_single(self, file_path: str, algorithm: str = "sha256") -> Optional[str]:
+    def fadvise(self, fd: int, offset: int, length: int, advice: str):
+        """posix_fadvise 的封装，不支持的平台上什么都不做"""
+        if self.drop_cache:
+            try:
+                os.posix_fadvise(fd, offset, length, getattr(os, advice))
+            except OSError:
+                pass
+    
+    def calculate_single(self, file_path: str, algorithm: str = "sha256",
+                         chunk_size: int = 8192) -> Optional[str]:
         """只计算指定算法的哈希值"""
         if algorithm not in self._hash_funcs:
             raise ValueError(f"不支持的算法: {algorithm}")
@@ -57,7 +116,7 @@ class HashCalculator:
         
         try:
             with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(8192), b''):
+                for chunk in iter(lambda: f.read(chunk_size), b''):
                     hash_obj.update(chunk)
             return hash_obj.hexdigest()
         
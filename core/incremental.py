@@ -0,0 +1,119 @@
+
+# core/incremental.py
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError
+from pathlib import Path
+from typing import Callable, Optional
+
+from core.io_scheduler import PRIORITY_BACKGROUND, SchedulerClosed
+from core.records import FileRecord
+
+
+class _PartialState:
+    __slots__ = ("hashes", "offset", "lock", "future")
+
+    def __init__(self, hashes):
+        self.hashes = hashes
+        self.offset = 0
+        self.lock = threading.Lock()  # 同一文件的读取按顺序进行，不同文件互不影响
+        self.future = None            # 排队或正在进行的读取任务
+
+
+class IncrementalHasher:
+    """
+    边下载边计算哈希
+    浏览器的临时文件（.crdownload / .part）是顺序追加写入的，每次修改事件只需读取新增部分；
+    下载完成重命名为正式文件时，哈希几乎立即可得，不必再完整读取一遍
+    读取交给 I/O 调度器（后台优先级，受每设备并发和速率上限约束），不占用 watchdog 的事件线程
+    """
+
+    def __init__(self, hash_calculator, io_scheduler, maxsize: int = 16, chunk_size: int = 1024 * 1024):
+        self.hash_calculator = hash_calculator
+        self.io_scheduler = io_scheduler
+        self.maxsize = maxsize  # 同时跟踪的临时文件数上限（每个约占几百字节的哈希状态）
+        self.chunk_size = chunk_size
+        self._states = OrderedDict()
+        self._lock = threading.Lock()  # 只保护 _states
+
+    def feed(self, file_path: str):
+        """安排读取临时文件中新增的数据（不等待读取完成）"""
+        with self._lock:
+            state = self._states.pop(file_path, None)
+            if state is None:
+                state = _PartialState(self.hash_calculator.new_hashes())
+            self._states[file_path] = state
+            while len(self._states) > self.maxsize:
+                self._states.popitem(last=False)
+            # 已有任务在排队或读取中：它会读到当前文件末尾，之后的数据由下一次修改事件或 finish 读取
+            if state.future is not None and not state.future.done():
+                return
+            try:
+                state.future = self._submit(file_path, state)
+            except SchedulerClosed:
+                pass  # 调度器已关闭
+
+    def finish(self, temp_path: str, final_path: str) -> Optional[FileRecord]:
+        """
+        临时文件被重命名为正式文件：读取剩余数据并生成记录
+        文件大小与已读取的字节数不一致时（例如被截断或非顺序写入）返回 None，由调用方完整计算
+        """
+        with self._lock:
+            state = self._states.pop(temp_path, None)
+        if state is None:
+            return None
+        try:
+            if not self._submit(final_path, state).result():
+                return None
+        except (CancelledError, SchedulerClosed):
+            return None
+
+        with state.lock:
+            try:
+                st = os.stat(final_path)
+            except OSError:
+                return None
+            if st.st_size != state.offset:
+                return None
+            return FileRecord(
+                final_path, Path(final_path).name, st.st_size, st.st_mtime_ns,
+                {name: h.digest() for name, h in state.hashes.items()}
+            )
+
+    def discard(self, file_path: str):
+        with self._lock:
+            self._states.pop(file_path, None)
+
+    def _submit(self, file_path: str, state: _PartialState):
+        return self.io_scheduler.submit(
+            file_path,
+            lambda throttle: self._read(file_path, state, throttle),
+            PRIORITY_BACKGROUND
+        )
+
+    def _read(self, file_path: str, state: _PartialState, throttle: Callable[[int], None]) -> bool:
+        with state.lock:
+            try:
+                with open(file_path, 'rb') as f:
+                    fd = f.fileno()
+                    size = os.fstat(fd).st_size
+                    if size < state.offset:
+                        # 文件变小：下载被重新开始，从头计算
+                        state.hashes = self.hash_calculator.new_hashes()
+                        state.offset = 0
+                    start = state.offset
+                    f.seek(start)
+                    while True:
+                        chunk = f.read(self.chunk_size)
+                        if not chunk:
+                            break
+                        for h in state.hashes.values():
+                            h.update(chunk)
+                        state.offset += len(chunk)
+                        throttle(len(chunk))
+                    # 新数据已计入哈希，释放这部分页缓存
+                    self.hash_calculator.fadvise(fd, start, state.offset - start, 'POSIX_FADV_DONTNEED')
+                return True
+            except OSError:
+                return False
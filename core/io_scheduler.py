@@ -0,0 +1,189 @@
+
+# core/io_scheduler.py
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Dict
+
+# 任务优先级：交互请求（用户点击、IPC 调用）优先于后台任务（监控、批量校验）
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+
+class SchedulerClosed(RuntimeError):
+    """调度器已关闭，不再接受新任务"""
+
+
+class RateLimiter:
+    """令牌桶限速，所有设备共享同一个每秒字节数上限"""
+
+    def __init__(self, bytes_per_second: int = 0):
+        self.bytes_per_second = bytes_per_second
+        self._allowance = float(bytes_per_second)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, nbytes: int):
+        """消耗 nbytes 的额度，额度不足时休眠（bytes_per_second 为 0 表示不限速）"""
+        rate = self.bytes_per_second
+        if rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._allowance = min(float(rate), self._allowance + (now - self._last) * rate)
+            self._last = now
+            self._allowance -= nbytes
+            wait = -self._allowance / rate if self._allowance < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class _Job:
+    __slots__ = ("func", "priority", "future")
+
+    def __init__(self, func: Callable, priority: int):
+        self.func = func
+        self.priority = priority
+        self.future = Future()
+
+
+class _Device:
+    """同一设备（st_dev）上的任务队列和工作线程"""
+
+    def __init__(self, dev: int):
+        self.dev = dev
+        self.interactive = deque()
+        self.background = deque()
+        self.interactive_pending = 0  # 排队或执行中的交互任务数，后台任务会为其让出带宽
+        self.workers = 0
+        self.has_interactive_worker = False
+        self.cond = threading.Condition()
+
+
+class IOScheduler:
+    """
+    按设备分组的 I/O 调度器
+    - 每个设备单独限制并发（同一块机械硬盘上同时读多个大文件会严重抖动）
+    - 每个设备额外保留一个只处理交互任务的线程，交互请求不必排在后台任务后面
+    - 有交互任务时，同一设备上的后台任务在读取下一块之前暂停
+    - 可选的全局字节速率上限，避免抢占浏览器下载本身的带宽
+    """
+
+    def __init__(self, concurrency_per_device: int = 1, bytes_per_second: int = 0):
+        self.concurrency = max(1, concurrency_per_device)
+        self.limiter = RateLimiter(bytes_per_second)
+        self._devices: Dict[int, _Device] = {}
+        self._lock = threading.Lock()
+        self._running = True
+
+    def submit(self, path: str, func: Callable, priority: int = PRIORITY_BACKGROUND) -> Future:
+        """
+        提交一个读取 path 的任务
+        func 接收一个 throttle(nbytes) 回调，应在每读取一块数据后调用
+        调度器关闭后提交会抛出 SchedulerClosed（RuntimeError 的子类，与 ThreadPoolExecutor 一致）
+        """
+        if not self._running:
+            raise SchedulerClosed("cannot schedule new futures after shutdown")
+        device = self._device(path)
+        job = _Job(func, priority)
+        with device.cond:
+            if not self._running:
+                raise SchedulerClosed("cannot schedule new futures after shutdown")
+            if priority <= PRIORITY_INTERACTIVE:
+                device.interactive.append(job)
+                device.interactive_pending += 1
+                if not device.has_interactive_worker:
+                    device.has_interactive_worker = True
+                    self._spawn(device, interactive_only=True)
+            else:
+                device.background.append(job)
+            if device.workers < self.concurrency:
+                device.workers += 1
+                self._spawn(device, interactive_only=False)
+            device.cond.notify_all()
+        return job.future
+
+    def set_concurrency(self, concurrency_per_device: int):
+        """调整每个设备的并发数（多余的线程在空闲时退出）"""
+        self.concurrency = max(1, concurrency_per_device)
+        with self._lock:
+            devices = list(self._devices.values())
+        for device in devices:
+            with device.cond:
+                device.cond.notify_all()
+
+    def set_rate(self, bytes_per_second: int):
+        self.limiter.bytes_per_second = bytes_per_second
+
+    def shutdown(self):
+        self._running = False
+        with self._lock:
+            devices = list(self._devices.values())
+        for device in devices:
+            with device.cond:
+                for job in list(device.interactive) + list(device.background):
+                    job.future.cancel()
+                device.interactive.clear()
+                device.background.clear()
+                device.cond.notify_all()
+
+    def _device(self, path: str) -> _Device:
+        try:
+            dev = os.stat(path).st_dev
+        except OSError:
+            dev = -1
+        with self._lock:
+            device = self._devices.get(dev)
+            if device is None:
+                device = self._devices[dev] = _Device(dev)
+            return device
+
+    def _spawn(self, device: _Device, interactive_only: bool):
+        name = f"EasySha-IO-{device.dev}{'-interactive' if interactive_only else ''}"
+        threading.Thread(target=self._worker, args=(device, interactive_only),
+                         name=name, daemon=True).start()
+
+    def _worker(self, device: _Device, interactive_only: bool):
+        while True:
+            with device.cond:
+                while self._running and not device.interactive and \
+                        (interactive_only or not device.background):
+                    if not interactive_only and device.workers > self.concurrency:
+                        break
+                    device.cond.wait()
+                if device.interactive:
+                    job = device.interactive.popleft()
+                elif not interactive_only and device.background and self._running:
+                    job = device.background.popleft()
+                else:
+                    # 停止运行，或者并发数被调小
+                    if interactive_only:
+                        device.has_interactive_worker = False
+                    else:
+                        device.workers -= 1
+                    return
+
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_result(job.func(self._throttle(device, job)))
+            except BaseException as e:
+                job.future.set_exception(e)
+            finally:
+                if job.priority <= PRIORITY_INTERACTIVE:
+                    with device.cond:
+                        device.interactive_pending -= 1
+                        device.cond.notify_all()
+
+    def _throttle(self, device: _Device, job: _Job) -> Callable[[int], None]:
+        limiter = self.limiter
+        background = job.priority > PRIORITY_INTERACTIVE
+
+        def throttle(nbytes: int):
+            limiter.consume(nbytes)
+            if background and device.interactive_pending:
+                with device.cond:
+                    while device.interactive_pending and self._running:
+                        device.cond.wait(0.5)
+        return throttle
@@ -1,6 +1,11 @@
 # core/notifier.py
-from win11toast import toast
-from typing import Dict, Optional, Callable, Any
+from typing import Dict, List, Optional, Callable, Any
+
+
+def toast(*args, **kwargs):
+    """延迟导入 win11toast，只有真正需要弹出通知时才加载 WinRT 相关模块"""
+    from win11toast import toast as _toast
+    return _toast(*args, **kwargs)
 
 class NotificationService:
     """封装 win11toast 的同步通知服务"""
@@ -95,6 +100,32 @@ class NotificationService:
             duration='long'
         )
     
+    def show_batch_result(self, checksum_name: str, passed: List[str],
+                          failed: List[str], missing: List[str]):
+        """显示校验和文件的批量校验结果（汇总为一条通知）"""
+        total = len(passed) + len(failed)
+        if failed:
+            title = f"❌ {checksum_name}: {len(failed)}/{total} 个文件校验失败"
+            lines = [f"✗ {name}" for name in failed[:3]]
+            if len(failed) > 3:
+                lines.append(f"... 等 {len(failed)} 个")
+        else:
+            title = f"✅ {checksum_name}: {len(passed)} 个文件全部通过"
+            lines = [f"✓ {name}" for name in passed[:3]]
+            if len(passed) > 3:
+                lines.append(f"... 等 {len(passed)} 个")
+        if missing:
+            lines.append(f"未找到 {len(missing)} 个文件")
+        
+        toast(
+            title,
+            "\n".join(lines),
+            icon=self.app_icon,
+            on_click=self.callback_handler,
+            audio=None if failed else 'ms-winsoundevent:Notification.Looping.Alarm',
+            duration='long'
+        )
+    
     def show_clipboard_detected(self, hash_value: str):
         """显示检测到剪贴板中的哈希值"""
     
@@ -120,4 +151,50 @@ class NotificationService:
     
     def set_sound_enabled(self, enabled: bool):
         """设置是否启用音效"""
-        self._sound_enabled = enabled
\ No newline at end of file
+        self._sound_enabled = enabled
+
+
+class ConsoleNotifier:
+    """无界面模式下的通知服务，把通知输出到终端（不加载任何 UI 库）"""
+
+    def __init__(self, app_name: str = "EasySha", app_icon: str = None):
+        self.app_name = app_name
+        self.app_icon = app_icon
+        self.current_file = None
+        self.callback_handler = None
+
+    def set_callback_handler(self, handler):
+        self.callback_handler = handler
+
+    def show_file_detected(self, file_name: str, file_size: str, hashes: Dict[str, str]):
+        self.current_file = {
+            'name': file_name,
+            'hashes': hashes
+        }
+        print(f"📁 新文件: {file_name} ({file_size})")
+        for name, value in hashes.items():
+            print(f"   {name.upper()}: {value}")
+
+    def show_verification_success(self, file_name: str):
+        print(f"✅ 验证成功: {file_name}")
+
+    def show_verification_failed(self, file_name: str, expected: str, actual: str):
+        print(f"❌ 验证失败: {file_name}\n   期望: {expected}\n   实际: {actual}")
+
+    def show_batch_result(self, checksum_name: str, passed: List[str],
+                          failed: List[str], missing: List[str]):
+        print(f"📑 {checksum_name}: 通过 {len(passed)}，失败 {len(failed)}，未找到 {len(missing)}")
+        for name in failed:
+            print(f"   ❌ {name}")
+
+    def show_clipboard_detected(self, hash_value: str):
+        """无界面模式下不提示"""
+
+    def show_ready(self):
+        print("🚀 EasySha 已就绪（无界面模式）")
+
+    def show_info(self, title: str, message: str):
+        print(f"{title}: {message}")
+
+    def set_sound_enabled(self, enabled: bool):
+        self._sound_enabled = enabled
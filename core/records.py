@@ -0,0 +1,40 @@
+
+# core/records.py
+from typing import Dict, Optional
+
+# 记录中保存的哈希算法（与 HashCalculator 支持的算法一致）
+ALGORITHMS = ("md5", "sha1", "sha256", "sha512")
+
+
+class FileRecord:
+    """
+    已计算哈希的文件记录
+    使用 __slots__ 并以原始 bytes 保存摘要，单条记录比四个十六进制字符串的字典小得多
+    """
+    __slots__ = ("path", "name", "size", "mtime_ns") + ALGORITHMS
+
+    def __init__(self, path: str, name: str, size: int, mtime_ns: int,
+                 digests: Dict[str, bytes]):
+        self.path = path
+        self.name = name
+        self.size = size
+        self.mtime_ns = mtime_ns
+        for algorithm in ALGORITHMS:
+            setattr(self, algorithm, digests.get(algorithm))
+
+    def digest(self, algorithm: str = "sha256") -> Optional[bytes]:
+        """返回指定算法的原始摘要"""
+        return getattr(self, algorithm, None) if algorithm in ALGORITHMS else None
+
+    def hexdigest(self, algorithm: str = "sha256") -> str:
+        """返回指定算法的十六进制摘要（仅在显示或复制时生成）"""
+        value = self.digest(algorithm)
+        return value.hex() if value else ""
+
+    def hexdigests(self) -> Dict[str, str]:
+        """所有摘要的十六进制形式，用于通知显示"""
+        return {a: self.hexdigest(a) for a in ALGORITHMS if self.digest(a)}
+
+    def is_fresh(self, size: int, mtime_ns: int) -> bool:
+        """文件大小和修改时间都没变时，缓存的摘要仍然有效"""
+        return self.size == size and self.mtime_ns == mtime_ns
@@ -0,0 +1,71 @@
+
+# core/timer.py
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable
+
+
+class TimerHandle:
+    """call_later 返回的句柄，可用于取消尚未执行的任务"""
+    __slots__ = ("when", "func", "cancelled")
+
+    def __init__(self, when: float, func: Callable):
+        self.when = when
+        self.func = func
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerPool:
+    """
+    所有延时任务共用一个后台线程
+    代替"每次延时都新开一个线程再 sleep"的做法，长时间运行时线程数保持不变
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = True
+
+    def call_later(self, delay: float, func: Callable) -> TimerHandle:
+        """delay 秒后在定时线程中执行 func"""
+        handle = TimerHandle(time.monotonic() + delay, func)
+        with self._cond:
+            heapq.heappush(self._heap, (handle.when, next(self._counter), handle))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="EasySha-Timer", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return handle
+
+    def shutdown(self):
+        """停止定时线程，未执行的任务会被丢弃"""
+        with self._cond:
+            self._running = False
+            self._heap.clear()
+            self._cond.notify()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and (not self._heap or self._heap[0][0] > time.monotonic()):
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._cond.wait(timeout)
+                if not self._running:
+                    return
+                _, _, handle = heapq.heappop(self._heap)
+            if handle.cancelled:
+                continue
+            try:
+                handle.func()
+            except Exception as e:
+                print(f"定时任务出错: {e}")
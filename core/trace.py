@@ -0,0 +1,80 @@
+
+# core/trace.py
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class TraceRecorder:
+    """
+    把文件事件、剪贴板变化和按钮回调按时间记录为 JSON Lines，供 sim.replay 回放
+    文件事件只记录所在监控文件夹的序号、文件名和当时的大小，不记录文件内容
+    时间从本次启动开始计算，所以每次启动都会覆盖之前的记录
+    """
+
+    def __init__(self, path: str, folders: List[str]):
+        self.path = path
+        self.folders = [os.path.abspath(f) for f in folders]
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = open(path, 'w', encoding='utf-8', buffering=1)
+
+    def record_fs(self, event):
+        """记录 watchdog 事件（目录事件忽略）"""
+        if event.is_directory:
+            return
+        entry = {'kind': 'fs', 'type': event.event_type}
+        entry.update(self._locate(event.src_path))
+        dest = getattr(event, 'dest_path', '')
+        if dest:
+            entry['dest'] = self._locate(dest)['path']
+        try:
+            entry['size'] = os.stat(dest or event.src_path).st_size
+        except OSError:
+            pass
+        self._write(entry)
+
+    def record_clipboard(self, value: str):
+        self._write({'kind': 'clipboard', 'value': value})
+
+    def record_button(self, args: Dict[str, Any]):
+        self._write({'kind': 'button', 'args': args})
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def _locate(self, file_path: str) -> Dict[str, Any]:
+        """文件路径 -> {'root': 监控文件夹序号, 'path': 相对路径}"""
+        path = os.path.abspath(file_path)
+        for index, folder in enumerate(self.folders):
+            if os.path.dirname(path) == folder or path.startswith(folder + os.sep):
+                return {'root': index, 'path': os.path.relpath(path, folder)}
+        return {'root': None, 'path': path}
+
+    def _write(self, entry: Dict[str, Any]):
+        entry['t'] = round(time.monotonic() - self._start, 6)
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + '\n')
+
+
+def read_trace(path: str) -> Iterator[Dict[str, Any]]:
+    """逐行读取记录文件（按时间排序）"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def write_trace(path: str, events: List[Dict[str, Any]], meta: Optional[Dict[str, Any]] = None):
+    """保存（合成的）事件序列"""
+    with open(path, 'w', encoding='utf-8') as f:
+        if meta:
+            f.write(json.dumps({'kind': 'meta', 't': 0, **meta}, ensure_ascii=False) + '\n')
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n')
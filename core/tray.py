@@ -1,11 +1,9 @@
 
 # core/tray.py
-import pystray
-from PIL import Image, ImageDraw
+# pystray 和 PIL 只在托盘真正运行时才导入，避免拖慢启动
 import threading
 import os
 import sys
-from pathlib import Path
 import webbrowser
 
 class SystemTray:
@@ -14,10 +12,10 @@ class SystemTray:
     def __init__(self, app):
         self.app = app
         self.icon = None
-        self.icon_image = self._create_default_icon()
         
     def _create_default_icon(self):
         """创建一个默认的托盘图标（绿色盾牌）"""
+        from PIL import Image, ImageDraw
         # 创建一个 64x64 的图像
         image = Image.new('RGB', (64, 64), color=(255, 255, 255))
         draw = ImageDraw.Draw(image)
@@ -34,6 +32,7 @@ class SystemTray:
     
     def _create_menu(self):
         """创建托盘右键菜单"""
+        import pystray
         return pystray.Menu(
             pystray.MenuItem(
                 "📁 监控的文件夹",
@@ -100,7 +99,7 @@ class SystemTray:
     def _get_last_file_status(self):
         """获取最后文件的状态"""
         if self.app.current_file:
-            name = Path(self.app.current_file['name']).name
+            name = self.app.current_file.name
             if len(name) > 20:
                 name = name[:17] + "..."
             return name
@@ -224,6 +223,9 @@ class SystemTray:
     
     def update_icon_state(self, status: str = "normal"):
         """更新图标状态（可根据状态改变图标颜色）"""
+        if not self.icon:
+            return
+        from PIL import Image, ImageDraw
         if status == "verifying":
             # 待验证状态 - 黄色
             image = Image.new('RGB', (64, 64), color=(255, 255, 255))
@@ -259,13 +261,29 @@ class SystemTray:
             self.icon = icon
             icon.visible = True
         
+        import pystray
+        
         # 创建托盘图标
         self.icon = pystray.Icon(
             "EasySha",
-            self.icon_image,
+            self._create_default_icon(),
             "EasySha - 自动文件校验",
             self._create_menu()
         )
         
         # 在独立线程中运行
-        threading.Thread(target=self.icon.run, daemon=True).start()
\ No newline at end of file
+        threading.Thread(target=self.icon.run, daemon=True).start()
+
+
+class NullTray:
+    """无界面模式下的托盘占位对象，不加载 pystray / PIL"""
+
+    def __init__(self, app):
+        self.app = app
+        self.icon = None
+
+    def update_icon_state(self, status: str = "normal"):
+        pass
+
+    def run(self):
+        pass
@@ -0,0 +1,301 @@
+
+# core/watchers.py
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from watchdog.events import (
+    DirCreatedEvent, DirDeletedEvent,
+    FileCreatedEvent, FileDeletedEvent, FileModifiedEvent, FileMovedEvent,
+)
+
+# 可选的监控后端
+BACKENDS = ("auto", "native", "inotify", "polling", "smart_polling")
+
+# 认为是网络共享的文件系统类型（Linux /proc/mounts 中的 fstype）
+_NETWORK_FS = {"nfs", "nfs4", "cifs", "smb", "smb3", "smbfs", "fuse.sshfs", "9p", "afs"}
+
+
+def create_observer(backend: str = "native", polling_interval: float = 1.0):
+    """
+    根据名称创建 observer
+    - native: watchdog 默认实现（Linux 为 inotify，Windows 为 ReadDirectoryChangesW）
+    - inotify: 强制使用 inotify（仅 Linux）
+    - polling: watchdog 自带的轮询实现（每次轮询都 stat 所有文件）
+    - smart_polling: 基于目录 mtime 的增量轮询，适合 SMB/NFS 共享
+    """
+    if backend == "native":
+        from watchdog.observers import Observer
+        return Observer()
+    if backend == "inotify":
+        from watchdog.observers.inotify import InotifyObserver
+        return InotifyObserver()
+    if backend == "polling":
+        from watchdog.observers.polling import PollingObserver
+        return PollingObserver(timeout=polling_interval)
+    if backend == "smart_polling":
+        return SmartPollingObserver(interval=polling_interval)
+    raise ValueError(f"不支持的监控后端: {backend}")
+
+
+def resolve_backend(folder: str, backend: str = "auto") -> str:
+    """auto 时根据文件夹所在位置选择后端：网络共享用增量轮询，本地用原生通知"""
+    if backend != "auto":
+        return backend
+    return "smart_polling" if is_network_path(folder) else "native"
+
+
+def is_network_path(folder: str) -> bool:
+    """判断文件夹是否位于网络共享上（原生文件通知在这类位置上不可靠）"""
+    path = os.path.abspath(folder)
+    if sys.platform == "win32":
+        if path.startswith("\\\\"):
+            return True
+        try:
+            import ctypes
+            drive = os.path.splitdrive(path)[0] + "\\"
+            return ctypes.windll.kernel32.GetDriveTypeW(drive) == 4  # DRIVE_REMOTE
+        except (AttributeError, OSError):
+            return False
+
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+
+    best, fstype = "", ""
+    for mount_point, fs in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        if (path == mount_point or path.startswith(mount_point.rstrip("/") + "/")) \
+                and len(mount_point) > len(best):
+            best, fstype = mount_point, fs
+    return fstype in _NETWORK_FS
+
+
+class _DirState:
+    """单个目录的快照：目录自身的 mtime 和其中条目的 (size, mtime_ns)"""
+    __slots__ = ("mtime_ns", "entries")
+
+    def __init__(self):
+        self.mtime_ns = None
+        self.entries: Dict[str, Optional[Tuple[int, int]]] = {}  # 子目录的值为 None
+
+
+class _Watch:
+    __slots__ = ("handler", "path", "recursive", "dirs")
+
+    def __init__(self, handler, path: str, recursive: bool):
+        self.handler = handler
+        self.path = path
+        self.recursive = recursive
+        self.dirs: Dict[str, _DirState] = {}
+
+
+class SmartPollingObserver(threading.Thread):
+    """
+    增量轮询 observer，接口与 watchdog 的 observer 相同（schedule / unschedule / start / stop / join）
+
+    每次轮询只对目录本身做一次 stat，目录 mtime 没变就不会 scandir；
+    只有新出现或最近有变化的"热"文件会被反复 stat，直到 hot_window 秒内不再变化。
+    目录 mtime 无法反映已有文件被原地改写，所以每隔 full_scan_interval 秒会完整 stat 一遍。
+    """
+
+    def __init__(self, interval: float = 1.0, hot_window: float = 10.0,
+                 mtime_granularity: float = 2.0, full_scan_interval: float = 300.0):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.hot_window = hot_window
+        self.mtime_granularity = mtime_granularity  # SMB/FAT 的 mtime 精度较粗，这段时间内总是重新扫描
+        self.full_scan_interval = full_scan_interval
+        self._watches: Dict[str, _Watch] = {}
+        self._hot: Dict[str, Tuple[_Watch, float]] = {}  # 文件路径 -> (所属 watch, 最后变化时间)
+        self._lock = threading.Lock()  # 保护快照；事件在释放锁之后才分发
+        self._events = []              # 本轮轮询收集到的 (watch, event)
+        self._stopped = threading.Event()
+        self._last_full_scan = time.monotonic()
+
+    def schedule(self, event_handler, path: str, recursive: bool = False) -> str:
+        """添加监控目录（只建立快照，不会为已有文件产生事件）"""
+        path = os.path.abspath(path)
+        watch = _Watch(event_handler, path, recursive)
+        self._scan_tree(watch, path, emit=False)
+        with self._lock:
+            self._watches[path] = watch
+        return path
+
+    def unschedule(self, watch: str):
+        """移除监控目录"""
+        with self._lock:
+            removed = self._watches.pop(watch, None)
+            if removed:
+                self._hot = {p: v for p, v in self._hot.items() if v[0] is not removed}
+
+    def unschedule_all(self):
+        with self._lock:
+            self._watches.clear()
+            self._hot.clear()
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"轮询监控出错: {e}")
+
+    def poll(self):
+        """执行一次轮询（正常情况下由后台线程调用）"""
+        now = time.monotonic()
+        full = self.full_scan_interval and now - self._last_full_scan >= self.full_scan_interval
+        if full:
+            self._last_full_scan = now
+
+        with self._lock:
+            for watch in list(self._watches.values()):
+                for folder in list(watch.dirs):
+                    self._poll_dir(watch, folder, full)
+            self._poll_hot(now)
+            events, self._events = self._events, []
+
+        # 处理事件可能很慢（例如同步计算大文件的哈希），不能阻塞 schedule / unschedule
+        for watch, event in events:
+            if self._watches.get(watch.path) is not watch:
+                continue  # 期间已被移除
+            try:
+                watch.handler.dispatch(event)
+            except Exception as e:
+                print(f"处理文件事件出错 {event.src_path}: {e}")
+
+    def _poll_dir(self, watch: _Watch, folder: str, full: bool):
+        state = watch.dirs.get(folder)
+        if state is None:
+            return
+        try:
+            st = os.stat(folder)
+        except OSError:
+            self._drop_dir(watch, folder)
+            return
+
+        recently_changed = time.time() - st.st_mtime < self.mtime_granularity
+        if st.st_mtime_ns != state.mtime_ns or recently_changed or full:
+            self._rescan(watch, folder, state, st.st_mtime_ns, full)
+
+    def _rescan(self, watch: _Watch, folder: str, state: _DirState, mtime_ns: int, full: bool):
+        """
+        对比目录条目：名称变化时才 stat 新条目，full 时 stat 所有文件
+        同一次扫描中消失和新出现的文件 (size, mtime_ns) 相同时视为重命名，发出 FileMovedEvent
+        （浏览器下载完成时 .part/.crdownload 会被重命名为正式文件）
+        """
+        state.mtime_ns = mtime_ns
+        try:
+            with os.scandir(folder) as it:
+                current = {entry.name: entry.is_dir(follow_symlinks=False) for entry in it}
+        except OSError:
+            return
+
+        old = state.entries
+        gone: Dict[Tuple[int, int], List[str]] = {}  # 消失的文件：(size, mtime_ns) -> 路径
+        for name in old.keys() - current.keys():
+            path = os.path.join(folder, name)
+            stat = old.pop(name)
+            if stat is None:
+                self._drop_dir(watch, path)
+                self._emit(watch, DirDeletedEvent(path))
+            else:
+                self._hot.pop(path, None)
+                gone.setdefault(stat, []).append(path)
+
+        for name, is_dir in current.items():
+            path = os.path.join(folder, name)
+            if name not in old:
+                if is_dir:
+                    old[name] = None
+                    self._emit(watch, DirCreatedEvent(path))
+                    if watch.recursive:
+                        self._scan_tree(watch, path, emit=True)
+                    continue
+                stat = old[name] = _file_stat(path)
+                self._hot[path] = (watch, time.monotonic())
+                sources = gone.get(stat)
+                if sources:
+                    self._emit(watch, FileMovedEvent(sources.pop(), path))
+                else:
+                    self._emit(watch, FileCreatedEvent(path))
+                    self._emit(watch, FileModifiedEvent(path))
+            elif full and not is_dir:
+                self._check_file(watch, path, old)
+
+        for paths in gone.values():
+            for path in paths:
+                self._emit(watch, FileDeletedEvent(path))
+
+    def _poll_hot(self, now: float):
+        """只 stat 最近有变化的文件；稳定超过 hot_window 的文件不再跟踪"""
+        for path, (watch, changed_at) in list(self._hot.items()):
+            folder, name = os.path.split(path)
+            state = watch.dirs.get(folder)
+            if state is None or name not in state.entries:
+                self._hot.pop(path, None)
+                continue
+            if self._check_file(watch, path, state.entries):
+                continue
+            if now - changed_at > self.hot_window:
+                self._hot.pop(path, None)
+
+    def _check_file(self, watch: _Watch, path: str, entries: Dict) -> bool:
+        """stat 单个文件，大小或 mtime 变化时发出修改事件"""
+        name = os.path.basename(path)
+        stat = _file_stat(path)
+        if stat is None or stat == entries.get(name):
+            return False
+        entries[name] = stat
+        self._hot[path] = (watch, time.monotonic())
+        self._emit(watch, FileModifiedEvent(path))
+        return True
+
+    def _scan_tree(self, watch: _Watch, root: str, emit: bool):
+        """建立目录（递归时包括子目录）的快照"""
+        pending = [root]
+        while pending:
+            folder = pending.pop()
+            state = _DirState()
+            try:
+                state.mtime_ns = os.stat(folder).st_mtime_ns
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            state.entries[entry.name] = None
+                            if watch.recursive:
+                                pending.append(entry.path)
+                        else:
+                            state.entries[entry.name] = _file_stat(entry.path)
+                            if emit:
+                                self._hot[entry.path] = (watch, time.monotonic())
+                                self._emit(watch, FileCreatedEvent(entry.path))
+                                self._emit(watch, FileModifiedEvent(entry.path))
+            except OSError:
+                continue
+            watch.dirs[folder] = state
+
+    def _drop_dir(self, watch: _Watch, folder: str):
+        prefix = folder.rstrip(os.sep) + os.sep
+        for path in [p for p in watch.dirs if p == folder or p.startswith(prefix)]:
+            del watch.dirs[path]
+        for path in [p for p in self._hot if p.startswith(prefix)]:
+            del self._hot[path]
+
+    def _emit(self, watch: _Watch, event):
+        self._events.append((watch, event))
+
+
+def _file_stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
@@ -1,8 +1,8 @@
 # handlers/button_handler.py
 import subprocess
-import pyperclip
 from pathlib import Path
 from typing import Dict, Any
+from core.io_scheduler import PRIORITY_INTERACTIVE
 
 class ButtonHandler:
     """处理来自 Toast 通知的按钮点击（同步版本）"""
@@ -15,6 +15,9 @@ class ButtonHandler:
         处理通知回调
         args 格式: {'arguments': 'easysha:copy', 'user_input': {}}
         """
+        if self.app.recorder:
+            self.app.recorder.record_button(args)
+        
         argument = args.get('arguments', '')
         user_input = args.get('user_input', {})
         
@@ -43,17 +46,20 @@ class ButtonHandler:
     
     def _copy_hash(self):
         """复制文件哈希到剪贴板"""
-        if self.app.current_file and 'hashes' in self.app.current_file:
-            sha256 = self.app.current_file['hashes'].get('sha256', '')
-            if sha256:
-                pyperclip.copy(sha256)
+        if self.app.current_file:
+            sha256 = self.app.current_file.hexdigest('sha256')
+            if sha256 and self.app.clipboard_monitor:
+                self.app.clipboard_monitor.copy(sha256)
                 self.app.notifier.show_info("✅ 已复制", "SHA256 已复制到剪贴板")
     
     def _start_verification(self):
         """开始验证（等待剪贴板哈希）"""
         self.app.notifier.show_info("🔍 等待验证", "请复制校验和到剪贴板...")
-        # 标记当前文件为待验证状态
-        self.app.pending_verification = self.app.current_file
+        # 标记当前文件为待验证状态（文件在检测后被改动过时，以交互优先级重新计算）
+        record = self.app.current_file
+        if record:
+            record = self.app.get_record(record.path, PRIORITY_INTERACTIVE) or record
+        self.app.pending_verification = record
         # 更新托盘图标状态
         self.app.tray.update_icon_state("verifying")
     
@@ -66,17 +72,17 @@ class ButtonHandler:
     
     def _open_folder(self):
         """打开文件所在文件夹"""
-        if self.app.current_file and 'path' in self.app.current_file:
-            folder = Path(self.app.current_file['path']).parent
+        if self.app.current_file:
+            folder = Path(self.app.current_file.path).parent
             if folder.exists():
                 subprocess.run(['explorer', str(folder)])
     
     def _copy_actual(self):
         """复制实际哈希值（验证失败时）"""
-        if self.app.current_file and 'hashes' in self.app.current_file:
-            sha256 = self.app.current_file['hashes'].get('sha256', '')
-            if sha256:
-                pyperclip.copy(sha256)
+        if self.app.current_file:
+            sha256 = self.app.current_file.hexdigest('sha256')
+            if sha256 and self.app.clipboard_monitor:
+                self.app.clipboard_monitor.copy(sha256)
                 self.app.notifier.show_info("📋 已复制", "实际哈希值已复制到剪贴板")
     
     def _dismiss(self):
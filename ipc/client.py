@@ -0,0 +1,162 @@
+
+# ipc/client.py
+"""
+EasySha 本地服务的 Python 客户端
+
+    from ipc.client import EasyShaClient
+    with EasyShaClient() as client:
+        client.hash("/path/to/file.iso")["sha256"]
+        client.lookup("e3b0c442...")           # 已知文件列表
+        client.pipeline([{"op": "hash", "path": p} for p in paths])
+
+命令行：python -m ipc.client hash FILE... / lookup DIGEST / verify FILE DIGEST / ping
+"""
+import argparse
+import itertools
+import json
+import socket
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+from ipc.protocol import decode, default_address, encode, parse_address, read_token
+
+
+class IPCError(Exception):
+    """服务端返回的错误"""
+
+
+class EasyShaClient:
+    """长连接客户端，同一个实例可以在多个线程中使用"""
+
+    def __init__(self, address: Optional[str] = None, timeout: Optional[float] = 60.0):
+        self.address = address or default_address()
+        self.timeout = timeout
+        self.token = read_token() if self.address.startswith("tcp:") else ""
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._sock = None
+        self._reader = None
+
+    def connect(self):
+        kind, target = parse_address(self.address)
+        family = socket.AF_UNIX if kind == "unix" else socket.AF_INET
+        self._sock = socket.socket(family, socket.SOCK_STREAM)
+        self._sock.settimeout(self.timeout)
+        self._sock.connect(target)
+        self._reader = self._sock.makefile("rb")
+        return self
+
+    def close(self):
+        if self._sock:
+            if self._reader:
+                self._reader.close()
+            self._sock.close()
+            self._sock = None
+            self._reader = None
+
+    def __enter__(self):
+        return self.connect() if self._sock is None else self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def call(self, op: str, **params) -> Any:
+        """发送单个请求并等待结果"""
+        return self.pipeline([dict(params, op=op)])[0]
+
+    def pipeline(self, requests: List[Dict[str, Any]], raise_errors: bool = True) -> List[Any]:
+        """
+        一次性发送多个请求再统一读取响应（服务端并发处理）
+        返回与 requests 顺序一致的结果；raise_errors=False 时出错的项为 IPCError 对象
+        """
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self.connect()
+                ids = []
+                payload = bytearray()
+                for request in requests:
+                    request_id = next(self._ids)
+                    ids.append(request_id)
+                    message = dict(request, id=request_id)
+                    if self.token:
+                        message['token'] = self.token
+                    payload += encode(message)
+                self._sock.sendall(payload)
+
+                responses = {}
+                while len(responses) < len(ids):
+                    line = self._reader.readline()
+                    if not line:
+                        raise ConnectionError("连接已被服务端关闭")
+                    response = decode(line)
+                    responses[response.get('id')] = response
+            except BaseException:
+                # 超时或出错后连接上可能还有迟到的响应，不能再复用；下次调用重新连接
+                self.close()
+                raise
+
+        results = []
+        for request_id in ids:
+            response = responses[request_id]
+            if response.get('ok'):
+                results.append(response.get('result'))
+            elif raise_errors:
+                raise IPCError(response.get('error'))
+            else:
+                results.append(IPCError(response.get('error')))
+        return results
+
+    def batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """把多个请求打包为一次 batch 请求，返回每项的 {'ok', 'result' / 'error'}"""
+        return self.call('batch', requests=requests)
+
+    def ping(self) -> Dict[str, Any]:
+        return self.call('ping')
+
+    def hash(self, path: str) -> Dict[str, Any]:
+        return self.call('hash', path=path)
+
+    def lookup(self, digest: str) -> List[Dict[str, Any]]:
+        return self.call('lookup', digest=digest)
+
+    def verify(self, path: str, digest: str) -> Dict[str, Any]:
+        return self.call('verify', path=path, digest=digest)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="EasySha 本地服务客户端")
+    parser.add_argument('--address', help="服务地址，例如 unix:/tmp/easysha.sock 或 tcp:127.0.0.1:48321")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('ping')
+    sub.add_parser('stats')
+    p = sub.add_parser('hash')
+    p.add_argument('paths', nargs='+')
+    p = sub.add_parser('lookup')
+    p.add_argument('digest')
+    p = sub.add_parser('verify')
+    p.add_argument('path')
+    p.add_argument('digest')
+    args = parser.parse_args(argv)
+
+    with EasyShaClient(args.address) as client:
+        if args.command == 'hash':
+            results = client.pipeline([{'op': 'hash', 'path': p} for p in args.paths],
+                                      raise_errors=False)
+            output = [r if not isinstance(r, IPCError) else {'error': str(r)} for r in results]
+        elif args.command == 'lookup':
+            output = client.lookup(args.digest)
+        elif args.command == 'verify':
+            output = client.verify(args.path, args.digest)
+        else:
+            output = client.call(args.command)
+
+    print(json.dumps(output, indent=2, ensure_ascii=False))
+    if args.command == 'verify':
+        return 0 if output.get('match') else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+
+# ipc/protocol.py
+"""
+本地 IPC 协议：每行一个紧凑的 JSON 对象（换行分隔）
+
+请求:  {"id": 1, "op": "hash", "path": "..."}
+响应:  {"id": 1, "ok": true, "result": {...}}  或  {"id": 1, "ok": false, "error": "..."}
+
+同一连接上可以连续发送多个请求而不必等待响应（流水线），
+服务端并发处理，响应可能乱序返回，客户端按 id 对应。
+op 为 "batch" 时，requests 字段中的多个请求会在一次往返中处理完毕。
+"""
+import json
+import os
+import secrets
+import sys
+from pathlib import Path
+from typing import Tuple, Union
+
+PROTOCOL_VERSION = 1
+
+# 默认的运行目录（Unix socket 和 TCP 令牌文件都放在这里）
+RUNTIME_DIR = Path.home() / ".easysha"
+TOKEN_FILE = RUNTIME_DIR / "ipc_token"
+DEFAULT_TCP_PORT = 48321
+
+
+def default_address() -> str:
+    """支持 AF_UNIX 的平台使用 Unix socket，否则使用本机 TCP"""
+    if sys.platform != "win32":
+        return f"unix:{RUNTIME_DIR / 'easysha.sock'}"
+    return f"tcp:127.0.0.1:{DEFAULT_TCP_PORT}"
+
+
+def parse_address(address: str) -> Tuple[str, Union[str, Tuple[str, int]]]:
+    """'unix:/path/to.sock' 或 'tcp:127.0.0.1:48321' -> (类型, 地址)"""
+    kind, _, rest = address.partition(":")
+    if kind == "unix" and rest:
+        return "unix", os.path.expanduser(rest)
+    if kind == "tcp" and rest:
+        host, _, port = rest.rpartition(":")
+        return "tcp", (host or "127.0.0.1", int(port))
+    raise ValueError(f"无效的 IPC 地址: {address}")
+
+
+def encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def decode(line: bytes) -> dict:
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("消息必须是 JSON 对象")
+    return message
+
+
+def create_token() -> str:
+    """生成 TCP 模式下的访问令牌并写入只有当前用户可读的文件"""
+    RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
+    token = secrets.token_hex(16)
+    TOKEN_FILE.write_text(token, encoding="utf-8")
+    try:
+        os.chmod(TOKEN_FILE, 0o600)
+    except OSError:
+        pass
+    return token
+
+
+def read_token() -> str:
+    try:
+        return TOKEN_FILE.read_text(encoding="utf-8").strip()
+    except OSError:
+        return ""
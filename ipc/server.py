@@ -0,0 +1,189 @@
+
+# ipc/server.py
+import hmac
+import os
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict
+
+from core.io_scheduler import PRIORITY_INTERACTIVE
+from core.digests import DigestQuery, match_record, normalize_digest
+from core.records import FileRecord
+from ipc.protocol import PROTOCOL_VERSION, create_token, decode, encode, parse_address
+
+# 单个请求行的最大长度，防止异常客户端占满内存
+MAX_LINE = 1024 * 1024
+
+
+def record_to_dict(record: FileRecord) -> Dict[str, Any]:
+    data = {'path': record.path, 'name': record.name, 'size': record.size}
+    data.update(record.hexdigests())
+    return data
+
+
+class EasyShaService:
+    """对外提供的操作，全部委托给 EasyShaApp（共享同一份缓存）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def handle(self, request: Dict[str, Any]) -> Any:
+        op = request.get('op')
+        if op == 'batch':
+            return [self._safe(r) for r in request.get('requests', [])]
+        method = getattr(self, f"op_{op}", None) if isinstance(op, str) else None
+        if method is None:
+            raise ValueError(f"未知操作: {op}")
+        return method(request)
+
+    def _safe(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """批量请求中的单项：出错不影响其他项"""
+        try:
+            return {'ok': True, 'result': self.handle(request)}
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+
+    def op_ping(self, request):
+        return {'version': PROTOCOL_VERSION}
+
+    def op_hash(self, request):
+        """计算（或从缓存读取）文件哈希"""
+        record = self.app.get_record(_require(request, 'path'), PRIORITY_INTERACTIVE)
+        if record is None:
+            raise FileNotFoundError(f"无法读取文件: {request['path']}")
+        return record_to_dict(record)
+
+    def op_lookup(self, request):
+        """查询某个摘要（或以 ... 结尾的前缀）是否对应已知文件"""
+        query = _require_digest(request)
+        return [record_to_dict(r) for r in self.app.find_by_digest(query)]
+
+    def op_verify(self, request):
+        """比较文件与给定摘要（按摘要长度确定算法）"""
+        query = _require_digest(request)
+        record = self.app.get_record(_require(request, 'path'), PRIORITY_INTERACTIVE)
+        if record is None:
+            raise FileNotFoundError(f"无法读取文件: {request['path']}")
+        algorithm = match_record(record, query)
+        return {'match': algorithm is not None, 'algorithm': algorithm or query.algorithm}
+
+    def op_stats(self, request):
+        return {'cached_records': len(self.app.records)}
+
+
+def _require(request: Dict[str, Any], key: str) -> str:
+    value = request.get(key)
+    if not isinstance(value, str) or not value:
+        raise ValueError(f"缺少参数: {key}")
+    return value
+
+
+def _require_digest(request: Dict[str, Any]) -> DigestQuery:
+    query = normalize_digest(_require(request, 'digest'))
+    if query is None:
+        raise ValueError("无效的摘要（支持 MD5/SHA1/SHA256/SHA512，或以 ... 结尾的前缀）")
+    return query
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """每个连接一个处理线程；请求交给线程池并发执行，响应按完成顺序写回"""
+
+    def handle(self):
+        server = self.server.ipc
+        write_lock = threading.Lock()
+        pending = set()  # 尚未完成的请求（完成后立即移除，长连接不会累积）
+
+        def respond(message) -> bool:
+            """写回一条响应，客户端已断开时返回 False"""
+            with write_lock:
+                try:
+                    self.wfile.write(encode(message))
+                    self.wfile.flush()
+                except OSError:
+                    return False
+            return True
+
+        def run(request):
+            request_id = request.get('id')
+            try:
+                message = {'id': request_id, 'ok': True, 'result': server.service.handle(request)}
+            except Exception as e:
+                message = {'id': request_id, 'ok': False, 'error': str(e)}
+            respond(message)
+
+        while True:
+            line = self.rfile.readline(MAX_LINE + 1)
+            if not line:
+                break
+            if len(line) > MAX_LINE:
+                respond({'id': None, 'ok': False, 'error': "请求过长"})
+                break
+            try:
+                request = decode(line)
+            except ValueError as e:
+                if not respond({'id': None, 'ok': False, 'error': f"无效请求: {e}"}):
+                    break
+                continue
+            if server.token and not hmac.compare_digest(str(request.get('token', '')), server.token):
+                if not respond({'id': request.get('id'), 'ok': False, 'error': "令牌无效"}):
+                    break
+                continue
+            future = server.executor.submit(run, request)
+            pending.add(future)
+            future.add_done_callback(pending.discard)
+
+        # 等待剩余的响应写完再关闭连接
+        wait(list(pending))
+
+
+class IPCServer:
+    """本地验证服务：通过 Unix socket 或本机 TCP 暴露 EasyShaApp 的哈希、缓存和索引"""
+
+    def __init__(self, app, address: str, max_workers: int = 4):
+        self.service = EasyShaService(app)
+        self.address = address
+        self.max_workers = max_workers
+        self.executor = None
+        self.token = ""
+        self._server = None
+
+    def start(self):
+        kind, target = parse_address(self.address)
+        if kind == "unix":
+            server_class = getattr(socketserver, 'ThreadingUnixStreamServer', None)
+            if server_class is None:
+                raise OSError("当前平台不支持 Unix socket，请使用 tcp: 地址")
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            if os.path.exists(target):
+                os.unlink(target)  # 上次异常退出留下的 socket 文件
+            old_umask = os.umask(0o177)  # socket 只允许当前用户访问
+            try:
+                self._server = server_class(target, _Handler)
+            finally:
+                os.umask(old_umask)
+        else:
+            if target[0] not in ('127.0.0.1', 'localhost', '::1'):
+                raise ValueError("IPC 服务只允许监听本机地址")
+            self.token = create_token()  # 本机其他用户也能连接 TCP 端口，需要令牌
+            self._server = socketserver.ThreadingTCPServer(target, _Handler)
+
+        self._server.daemon_threads = True
+        self._server.ipc = self
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                           thread_name_prefix="EasySha-IPC")
+        threading.Thread(target=self._server.serve_forever, name="EasySha-IPCServer",
+                         daemon=True).start()
+        print(f"IPC 服务已启动: {self.address}")
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            kind, target = parse_address(self.address)
+            if kind == "unix" and os.path.exists(target):
+                os.unlink(target)
+            self._server = None
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
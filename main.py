@@ -1,45 +1,123 @@
 # main.py
+import time
+_PROCESS_START = time.perf_counter()  # 用于统计启动耗时
+
+import argparse
+import hmac
+from concurrent.futures import CancelledError
 import threading
 import sys
 from pathlib import Path
-from config import Config
+from config import Config, CONFIG_FILE
 from core.hash_calculator import HashCalculator
 from core.file_monitor import FileMonitor
 from core.clipboard_monitor import ClipboardMonitor
-from core.notifier import NotificationService
-from core.tray import SystemTray
+from core.notifier import NotificationService, ConsoleNotifier
+from core.tray import SystemTray, NullTray
+from core.cache import LRUCache
+from core.digests import DigestTable, match_record, normalize_digest
+from core.timer import TimerPool
+from core.batch_verifier import BatchVerifier
+from core.io_scheduler import IOScheduler, SchedulerClosed, PRIORITY_BACKGROUND
+from core.expectations import ExpectationTable
+from core.incremental import IncrementalHasher
+from core.trace import TraceRecorder
+from core.config_watcher import ConfigWatcher
+from ipc.protocol import default_address
 from handlers.button_handler import ButtonHandler
-import time
 import os
 import signal
 
+# 只在启动时读取的配置项，运行中修改需要重启
+RESTART_FIELDS = ('headless', 'ipc_enabled', 'ipc_address', 'trace_file')
+
 class EasyShaApp:
     """主应用类，作为依赖注入容器"""
     
-    def __init__(self):
+    def __init__(self, config: Config = None, notifier=None, tray=None, clipboard_monitor=None):
+        """notifier / tray / clipboard_monitor 可以替换为其他实现（如 sim.stubs 中的模拟对象）"""
         # 加载配置
-        self.config = Config()
+        self.config = config or Config()
+        self.running = False
+        self._first_hash_reported = False
         
         # 设置开关
         self.notifications_enabled = True
         self.sound_enabled = True
         
-        # 初始化各个模块
-        self.hash_calculator = HashCalculator()
-        self.notifier = NotificationService(
+        # 初始化各个模块（UI 相关的库在各模块内部按需导入）
+        self.hash_calculator = HashCalculator(drop_cache=self.config.io_drop_cache)
+        
+        # 所有哈希读取都经过 I/O 调度器：按设备限制并发、限速、交互请求优先
+        self.io_scheduler = IOScheduler(
+            self.config.io_concurrency_per_device,
+            self.config.io_bytes_per_second
+        )
+        notifier_class = ConsoleNotifier if self.config.headless else NotificationService
+        self.notifier = notifier or notifier_class(
             app_name="EasySha", 
             app_icon=self.config.app_icon
         )
+        
+        # 事件记录（用于 sim.replay 回放）
+        self.recorder = None
+        if self.config.trace_file:
+            self.recorder = TraceRecorder(self.config.trace_file, self.config.download_folders)
+        
         self.file_monitor = FileMonitor(
             self.config.download_folders,
-            self.config.supported_extensions
+            self.config.supported_extensions,
+            backend=self.config.watcher_backend,
+            backends=self.config.watcher_backends,
+            polling_interval=self.config.polling_interval,
+            recorder=self.recorder
         )
-        self.clipboard_monitor = ClipboardMonitor()
+        # 无界面模式下没有剪贴板
+        if clipboard_monitor is None and not self.config.headless:
+            clipboard_monitor = ClipboardMonitor()
+        self.clipboard_monitor = clipboard_monitor
         
-        # 应用状态
+        # 应用状态（FileRecord）
         self.current_file = None
         self.pending_verification = None
         
+        # 最近计算过的文件记录（路径 -> FileRecord），容量有限，超出后淘汰最旧的
+        # digests 是同一批记录按摘要建立的索引，淘汰时同步移除
+        self.digests = DigestTable()
+        self.records = LRUCache(
+            self.config.max_cached_records,
+            on_evict=lambda path, record: self.digests.discard(record)
+        )
+        
+        # 先于文件出现的剪贴板哈希（下载完成后自动比对）
+        self.expectations = ExpectationTable(
+            self.config.expectation_ttl,
+            self.config.max_expectations
+        )
+        
+        # 下载中的临时文件边下载边计算哈希
+        self.incremental = IncrementalHasher(
+            self.hash_calculator,
+            self.io_scheduler,
+            self.config.max_incremental_files
+        )
+        
+        # 所有延时任务（如恢复托盘图标）共用一个定时线程
+        self.timers = TimerPool()
+        self._reset_icon_timer = None
+        
+        # 校验和文件的批量校验（复用 records 中的摘要）
+        self.batch_verifier = BatchVerifier(self.get_record, self.config.verify_workers)
+        self._verified_checksums = LRUCache(64)  # 已处理的校验和文件 -> (size, mtime_ns)
+        # 校验和文件中引用、但当时还没下载完的文件：完整路径 -> (校验和文件名, 条目)，下载完成后单独校验
+        self._pending_checksums = LRUCache(self.config.max_expectations)
+        
+        # 本地 IPC 服务（供下载工具、构建脚本调用），启动时才创建
+        self.ipc_server = None
+        
+        # 配置文件监视（由 watch_config 设置）
+        self.config_watcher = None
+        
         # 初始化按钮处理器
         self.button_handler = ButtonHandler(self)
         
@@ -47,8 +125,8 @@ class EasyShaApp:
         self.notifier.set_callback_handler(self.button_handler.handle_callback)
         self.notifier.set_sound_enabled(self.sound_enabled)
         
-        # 初始化系统托盘
-        self.tray = SystemTray(self)
+        # 初始化系统托盘（此时还不会创建图标）
+        self.tray = tray or (NullTray(self) if self.config.headless else SystemTray(self))
         
         # 处理退出信号
         signal.signal(signal.SIGINT, self.signal_handler)
@@ -63,26 +141,71 @@ class EasyShaApp:
         """当监控到新文件时的回调（从 watchdog 线程调用）"""
         self._handle_file_detected(file_path)
     
+    def get_record(self, file_path: str, priority: int = PRIORITY_BACKGROUND):
+        """
+        获取文件记录：文件未变化时直接使用缓存，否则交给 I/O 调度器重新计算
+        用户直接发起的请求应使用 PRIORITY_INTERACTIVE
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        
+        record = self.records.get(file_path)
+        if record and record.is_fresh(st.st_size, st.st_mtime_ns):
+            return record
+        
+        try:
+            future = self.io_scheduler.submit(
+                file_path,
+                lambda throttle: self.hash_calculator.calculate_record(file_path, throttle=throttle),
+                priority
+            )
+            record = future.result()
+        except (SchedulerClosed, CancelledError):
+            return None  # 正在关闭（计算本身抛出的异常照常向上传递）
+        
+        if record:
+            self._remember(record)
+        return record
+    
+    def _remember(self, record):
+        """加入缓存和摘要索引"""
+        self.records.put(record.path, record)
+        self.digests.add(record)
+    
+    def find_by_digest(self, query):
+        """在已缓存的记录中查找摘要（query 为 normalize_digest 的结果，支持截断的前缀）"""
+        return self.digests.lookup(query)
+    
     def _handle_file_detected(self, file_path: str):
         """同步处理新文件"""
         print(f"检测到新文件: {file_path}")
         
         # 计算哈希值
-        hashes = self.hash_calculator.calculate(file_path)
-        if not hashes:
+        record = self.get_record(file_path)
+        if not record:
             return
         
-        # 获取文件大小
-        file_size = Path(file_path).stat().st_size
-        size_str = self._format_size(file_size)
+        if not self._first_hash_reported:
+            self._first_hash_reported = True
+            print(f"⏱️ 首个哈希完成，距启动 {(time.perf_counter() - _PROCESS_START) * 1000:.0f} ms")
+        
+        size_str = self._format_size(record.size)
         
         # 保存到应用状态
-        self.current_file = {
-            'path': file_path,
-            'name': Path(file_path).name,
-            'hashes': hashes,
-            'size': size_str
-        }
+        self.current_file = record
+        
+        # 先下载的校验和文件中有这个文件的条目：直接给出结论
+        pending = self._pending_checksums.pop(os.path.realpath(record.path))
+        if pending:
+            self._report_checksum_entry(record, *pending)
+            return
+        
+        # 剪贴板中早已复制了这个文件的哈希：直接给出结论
+        if self.expectations.match(record):
+            self._report_match(record)
+            return
         
         # 更新托盘图标状态（正常）
         self.tray.update_icon_state("normal")
@@ -90,55 +213,142 @@ class EasyShaApp:
         # 如果通知启用，显示通知
         if self.notifications_enabled:
             self.notifier.show_file_detected(
-                Path(file_path).name,
+                record.name,
                 size_str,
-                hashes
+                record.hexdigests()
             )
     
+    def on_partial(self, file_path: str):
+        """下载中的临时文件有新数据（从 watchdog 线程调用）"""
+        self.incremental.feed(file_path)
+    
+    def on_partial_renamed(self, temp_path: str, final_path: str):
+        """临时文件重命名为正式文件：用增量结果填充缓存，随后的处理无需再读取整个文件"""
+        record = self.incremental.finish(temp_path, final_path)
+        if record:
+            self._remember(record)
+    
+    def on_checksum_file(self, file_path: str):
+        """当监控到校验和文件（SHA256SUMS、*.sha256 等）时的回调（从 watchdog 线程调用）"""
+        self._handle_checksum_file(file_path)
+    
+    def _handle_checksum_file(self, file_path: str):
+        """批量校验校验和文件中引用的文件，结果汇总为一条通知"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return
+        # 下载过程中会收到多次修改事件，内容没变就不重复校验
+        if self._verified_checksums.get(file_path) == (st.st_size, st.st_mtime_ns):
+            return
+        
+        print(f"检测到校验和文件: {file_path}")
+        result = self.batch_verifier.verify(file_path)
+        # 校验和文件通常比它列出的 ISO 先下载完：记下这些条目，文件出现后再校验
+        for target, entry in result.pending:
+            self._pending_checksums.put(target, (Path(file_path).name, entry))
+        if not result.checked:
+            return  # 引用的文件都还不在本地，之后的修改事件会再次校验
+        self._verified_checksums.put(file_path, (st.st_size, st.st_mtime_ns))
+        
+        self.tray.update_icon_state("success" if result.ok else "error")
+        if self.notifications_enabled:
+            self.notifier.show_batch_result(
+                Path(file_path).name,
+                result.passed,
+                result.failed,
+                result.missing
+            )
+        self._schedule_icon_reset()
+    
+    def _report_checksum_entry(self, record, checksum_name: str, entry):
+        """用先前下载的校验和文件中的条目校验新文件"""
+        actual = record.digest(entry.algorithm)
+        if actual and hmac.compare_digest(actual, entry.digest):
+            print(f"{record.name} 与 {checksum_name} 中的 {entry.algorithm.upper()} 一致")
+            self._report_match(record)
+            return
+        # 文件可能还在写入（非临时文件名下载），保留条目，之后的修改事件会再次比对
+        self._pending_checksums.put(os.path.realpath(record.path), (checksum_name, entry))
+        self.tray.update_icon_state("error")
+        if self.notifications_enabled:
+            self.notifier.show_verification_failed(
+                record.name,
+                entry.digest.hex(),
+                record.hexdigest(entry.algorithm)
+            )
+        self._schedule_icon_reset()
+    
     def on_clipboard_hash(self, hash_value: str):
         """当剪贴板中出现哈希值时的回调（从剪贴板线程调用）"""
+        if self.recorder:
+            self.recorder.record_clipboard(hash_value)
         self._handle_clipboard_hash(hash_value)
     
     def _handle_clipboard_hash(self, hash_value: str):
         """同步处理剪贴板哈希"""
+        # 十六进制文本只在这里解析一次，之后都以 bytes 比较
+        query = normalize_digest(hash_value)
+        if query is None:
+            return
+        
         # 显示检测到哈希值
         if self.notifications_enabled:
             self.notifier.show_clipboard_detected(hash_value)
         
         # 如果有待验证的文件，立即进行比对
         if self.pending_verification:
-            self._verify_with_pending(hash_value)
+            self._verify_with_pending(query)
+            return
+        
+        # 文件已经计算过：直接给出结论；否则记下来，等文件下载完成后自动比对
+        matches = self.find_by_digest(query)
+        if matches:
+            self._report_match(matches[-1])
+        else:
+            self.expectations.add(query, hash_value.strip())
+            print(f"已记录剪贴板哈希，等待对应文件: {query.text[:16]}...")
+    
+    def _report_match(self, record):
+        """剪贴板哈希与某个文件匹配（无论二者出现的先后顺序）"""
+        self.tray.update_icon_state("success")
+        if self.notifications_enabled:
+            self.notifier.show_verification_success(record.name)
+        if self.pending_verification is record:
+            self.pending_verification = None
+        self._schedule_icon_reset()
     
-    def _verify_with_pending(self, clipboard_hash: str):
-        """与待验证文件进行比对"""
-        file_hash = self.pending_verification['hashes'].get('sha256', '')
+    def _verify_with_pending(self, query):
+        """与待验证文件进行比对（常数时间比较原始摘要，按长度确定算法）"""
+        record = self.pending_verification
         
-        if file_hash.lower() == clipboard_hash.lower():
+        if match_record(record, query):
             # 验证成功
             self.tray.update_icon_state("success")
             if self.notifications_enabled:
-                self.notifier.show_verification_success(
-                    self.pending_verification['name']
-                )
+                self.notifier.show_verification_success(record.name)
         else:
             # 验证失败
             self.tray.update_icon_state("error")
             if self.notifications_enabled:
                 self.notifier.show_verification_failed(
-                    self.pending_verification['name'],
-                    clipboard_hash,
-                    file_hash
+                    record.name,
+                    query.text,
+                    record.hexdigest(query.algorithm or 'sha256')
                 )
         
         # 清除待验证状态
         self.pending_verification = None
         
-        # 3秒后恢复为正常状态
-        def reset_icon():
-            time.sleep(3)
-            self.tray.update_icon_state("normal")
-        
-        threading.Thread(target=reset_icon, daemon=True).start()
+        self._schedule_icon_reset()
+    
+    def _schedule_icon_reset(self):
+        """3秒后恢复为正常状态（新的结果会取消上一次尚未执行的恢复）"""
+        if self._reset_icon_timer:
+            self._reset_icon_timer.cancel()
+        self._reset_icon_timer = self.timers.call_later(
+            3, lambda: self.tray.update_icon_state("normal")
+        )
     
     def _format_size(self, size_bytes: int) -> str:
         """格式化文件大小"""
@@ -148,9 +358,88 @@ class EasyShaApp:
             size_bytes /= 1024.0
         return f"{size_bytes:.1f} TB"
     
+    def watch_config(self, path, loader):
+        """配置文件修改后自动重新加载（在 start 之前调用），loader 返回新的 Config"""
+        if self.config.config_reload_interval > 0:
+            self.config_watcher = ConfigWatcher(
+                path, self.timers, loader, self.apply_config,
+                self.config.config_reload_interval
+            )
+    
+    def apply_config(self, new: Config):
+        """
+        在运行中应用新配置：只调整有变化的部分
+        未变化的文件夹继续监控，正在进行的哈希计算和所有缓存都保留
+        """
+        old = self.config
+        for name in RESTART_FIELDS:
+            if getattr(new, name) != getattr(old, name):
+                print(f"配置项 {name} 需要重启后生效")
+                setattr(new, name, getattr(old, name))
+        
+        # 文件监控：只移除/添加有变化的文件夹
+        if (new.download_folders, new.watcher_backend, new.watcher_backends) != \
+                (old.download_folders, old.watcher_backend, old.watcher_backends):
+            self.file_monitor.update(new.download_folders, new.watcher_backend, new.watcher_backends)
+        if new.polling_interval != old.polling_interval:
+            self.file_monitor.set_polling_interval(new.polling_interval)
+        if new.supported_extensions != old.supported_extensions:
+            self.file_monitor.set_extensions(new.supported_extensions)
+        
+        # 缓存和线程池：缩小时只淘汰多余部分
+        self.records.resize(new.max_cached_records)
+        self.expectations.ttl = new.expectation_ttl
+        self.expectations.maxsize = new.max_expectations
+        self._pending_checksums.resize(new.max_expectations)
+        self.incremental.maxsize = new.max_incremental_files
+        self.batch_verifier.resize(new.verify_workers)
+        self.io_scheduler.set_concurrency(new.io_concurrency_per_device)
+        self.io_scheduler.set_rate(new.io_bytes_per_second)
+        self.hash_calculator.drop_cache = new.io_drop_cache and hasattr(os, 'posix_fadvise')
+        self.notifier.app_icon = new.app_icon
+        if self.config_watcher and new.config_reload_interval > 0:
+            self.config_watcher.interval = new.config_reload_interval
+        
+        self.config = new
+        print("✅ 配置已更新")
+    
     def run(self):
-        """运行主逻辑"""
+        """运行主逻辑（阻塞直到 shutdown）"""
+        self.start()
+        
+        try:
+            # 保持运行
+            while self.running:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.shutdown()
+    
+    def start(self):
+        """启动所有组件（不阻塞）"""
         print("🚀 EasySha 启动中...")
+        self.running = True
+        
+        # 先启动文件监控（observer 自带线程，不会阻塞），UI 在其后加载
+        self.file_monitor.start(
+            self.on_file_detected,
+            self.on_checksum_file,
+            self.on_partial,
+            self.on_partial_renamed
+        )
+        print(f"⏱️ 已开始监控，距启动 {(time.perf_counter() - _PROCESS_START) * 1000:.0f} ms")
+        
+        # 启动本地 IPC 服务
+        if self.config.ipc_enabled:
+            from ipc.server import IPCServer
+            self.ipc_server = IPCServer(self, self.config.ipc_address or default_address())
+            try:
+                self.ipc_server.start()
+            except (OSError, ValueError) as e:
+                print(f"IPC 服务启动失败: {e}")
+                self.ipc_server = None
+        
+        if self.config_watcher:
+            self.config_watcher.start()
         
         # 启动系统托盘（在独立线程中运行，因为 pystray 不是异步的）
         tray_thread = threading.Thread(target=self.tray.run, daemon=True)
@@ -160,45 +449,85 @@ class EasyShaApp:
         if self.notifications_enabled:
             self.notifier.show_ready()
         
-        # 启动文件监控（在独立线程中）
-        monitor_thread = threading.Thread(
-            target=self.file_monitor.start,
-            args=(self.on_file_detected,),
-            daemon=True
-        )
-        monitor_thread.start()
-        
-        # 启动剪贴板监控（在独立线程中）
-        clipboard_thread = threading.Thread(
-            target=self.clipboard_monitor.start,
-            args=(self.on_clipboard_hash,),
-            daemon=True
-        )
-        clipboard_thread.start()
+        # 启动剪贴板监控（在独立线程中，无界面模式下没有剪贴板）
+        if self.clipboard_monitor:
+            clipboard_thread = threading.Thread(
+                target=self.clipboard_monitor.start,
+                args=(self.on_clipboard_hash,),
+                daemon=True
+            )
+            clipboard_thread.start()
         
-        print("✅ EasySha 运行中，托盘图标已显示")
+        if self.config.headless:
+            print("✅ EasySha 运行中（无界面模式）")
+        else:
+            print("✅ EasySha 运行中，托盘图标已显示")
         print(f"监控文件夹: {self.config.download_folders}")
-        print("右键点击托盘图标可查看菜单")
-        
-        try:
-            # 保持运行
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            self.shutdown()
+        if not self.config.headless:
+            print("右键点击托盘图标可查看菜单")
     
     def shutdown(self):
         """关闭应用"""
+        if not self.running:
+            return
+        self.running = False
         print("\n🛑 正在关闭 EasySha...")
         self.file_monitor.stop()
-        self.clipboard_monitor.stop()
+        if self.clipboard_monitor:
+            self.clipboard_monitor.stop()
+        if self.config_watcher:
+            self.config_watcher.stop()
+        self.timers.shutdown()
+        self.batch_verifier.shutdown()
+        self.io_scheduler.shutdown()
+        if self.ipc_server:
+            self.ipc_server.stop()
         if self.tray.icon:
             self.tray.icon.stop()
+        if self.recorder:
+            self.recorder.close()
         print("👋 再见！")
 
-def main():
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="EasySha - 自动文件校验")
+    parser.add_argument('--headless', action='store_true',
+                        help="无界面模式：不显示托盘和通知，结果输出到终端")
+    parser.add_argument('--folder', action='append',
+                        help="要监控的文件夹（可重复，覆盖配置）")
+    parser.add_argument('--record', metavar='TRACE',
+                        help="把文件事件、剪贴板和按钮回调记录到文件，供 python -m sim.replay 回放")
+    parser.add_argument('--config', default=str(CONFIG_FILE), metavar='FILE',
+                        help="配置文件（JSON），运行中修改会自动生效")
+    parser.add_argument('--ipc', nargs='?', const='', metavar='ADDRESS',
+                        help="启动本地 IPC 服务，可指定地址（unix:/path 或 tcp:127.0.0.1:端口）")
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """同步入口函数"""
-    app = EasyShaApp()
+    args = parse_args(argv)
+    
+    def load_config():
+        """读取配置文件，命令行参数优先（重新加载时同样适用）"""
+        config = Config.load(args.config)
+        if args.headless:
+            config.headless = True
+        if args.folder:
+            config.download_folders = args.folder
+        if args.record:
+            config.trace_file = args.record
+        if args.ipc is not None:
+            config.ipc_enabled = True
+            config.ipc_address = args.ipc or config.ipc_address
+        return config
+    
+    try:
+        config = load_config()
+    except (OSError, ValueError, TypeError) as e:
+        print(f"❌ 配置文件无效: {e}")
+        return
+    app = EasyShaApp(config)
+    app.watch_config(args.config, load_config)
     try:
         app.run()
     except KeyboardInterrupt:
@@ -0,0 +1,320 @@
+
+# sim/replay.py
+"""
+回放记录的事件（或合成的下载序列），让真实的处理流程在模拟的通知、托盘和剪贴板下运行
+
+    python main.py --record trace.jsonl          # 正常使用时记录事件
+    python -m sim.replay trace.jsonl --speed 10  # 以 10 倍速回放
+    python -m sim.replay --synthetic 2000 --size 256K --rate 200 -o report.json
+"""
+import argparse
+import bisect
+import contextlib
+import hashlib
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from core.checksums import is_checksum_file
+from core.trace import read_trace, write_trace
+from sim.stubs import StubClipboardMonitor, StubNotifier, StubTray
+
+# 合成文件内容的重复单元大小
+_BLOCK_SIZE = 64 * 1024
+# 回放时写入临时文件的后缀，去掉后即为内容的种子（保证临时文件重命名前后内容一致）
+_TEMP_SUFFIXES = ('.crdownload', '.part', '.tmp')
+
+
+def _content_key(name: str) -> str:
+    for suffix in _TEMP_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def _content(name: str, offset: int, length: int) -> bytes:
+    """文件 name 在 offset 处的 length 字节合成内容（只由文件名决定，可重复生成）"""
+    seed = hashlib.sha256(_content_key(name).encode('utf-8')).digest()
+    block = seed * (_BLOCK_SIZE // len(seed))
+    start = offset % _BLOCK_SIZE
+    out = bytearray()
+    while len(out) < length:
+        out += block[start:start + length - len(out)]
+        start = 0
+    return bytes(out)
+
+
+def content_digest(name: str, size: int, algorithm: str = 'sha256') -> str:
+    """合成文件的摘要（用于生成“网页上复制的”校验和）"""
+    h = hashlib.new(algorithm)
+    offset = 0
+    while offset < size:
+        n = min(_BLOCK_SIZE, size - offset)
+        h.update(_content(name, offset, n))
+        offset += n
+    return h.hexdigest()
+
+
+def synthesize(count: int, size: int, rate: float = 100.0, steps: int = 4,
+               duration: float = 0.05, clipboard_ratio: float = 0.5,
+               clipboard_order: str = 'mixed', seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    生成 count 次下载的事件序列：.part 临时文件分 steps 次写入，duration 秒后重命名为正式文件
+    其中 clipboard_ratio 比例的下载会在下载前（before）或完成后（after）复制对应的 SHA256
+    """
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        final = f"download-{i:06d}.bin"
+        temp = final + '.part'
+        start = i / rate if rate > 0 else 0.0
+        events.append({'kind': 'fs', 'type': 'created', 'root': 0, 'path': temp, 'size': 0, 't': start})
+        for step in range(1, steps + 1):
+            events.append({'kind': 'fs', 'type': 'modified', 'root': 0, 'path': temp,
+                           'size': size * step // steps, 't': start + duration * step / (steps + 1)})
+        end = start + duration
+        events.append({'kind': 'fs', 'type': 'moved', 'root': 0, 'path': temp, 'dest': final,
+                       'size': size, 't': end})
+
+        if rng.random() < clipboard_ratio:
+            order = clipboard_order if clipboard_order != 'mixed' else rng.choice(('before', 'after'))
+            t = start - duration if order == 'before' else end + duration
+            events.append({'kind': 'clipboard', 'value': content_digest(final, size), 't': max(0.0, t)})
+
+    events.sort(key=lambda e: e['t'])
+    return events
+
+
+class ReplayDriver:
+    """把事件序列作用到沙盒文件夹（真实文件操作），剪贴板和按钮事件直接交给模拟对象"""
+
+    def __init__(self, app, folders: List[str], clipboard: StubClipboardMonitor):
+        self.app = app
+        self.folders = folders
+        self.clipboard = clipboard
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.writes: Dict[str, List[float]] = {}  # 文件名 -> 每次写入/重命名的时间
+
+    def play(self, events: List[Dict[str, Any]], speed: float = 1.0):
+        """按记录的时间间隔（除以 speed）依次执行；speed 为 0 表示不等待"""
+        origin = time.perf_counter()
+        for event in events:
+            if speed > 0:
+                delay = event.get('t', 0.0) / speed - (time.perf_counter() - origin)
+                if delay > 0:
+                    time.sleep(delay)
+            kind = event.get('kind')
+            label = f"{kind}.{event['type']}" if kind == 'fs' else kind
+            try:
+                if self.apply(event):
+                    self.counts[label] = self.counts.get(label, 0) + 1
+            except Exception as e:
+                self.errors[label] = self.errors.get(label, 0) + 1
+                print(f"回放事件出错 ({label}): {e}")
+
+    def apply(self, event: Dict[str, Any]) -> bool:
+        kind = event.get('kind')
+        if kind == 'fs':
+            return self._apply_fs(event)
+        if kind == 'clipboard':
+            self.clipboard.push(event['value'])
+            return True
+        if kind == 'button':
+            self.app.button_handler.handle_callback(event['args'])
+            return True
+        return False  # meta 等
+
+    def _apply_fs(self, event: Dict[str, Any]) -> bool:
+        root = event.get('root')
+        if root is None or root >= len(self.folders):
+            return False  # 监控文件夹之外的事件
+        path = os.path.join(self.folders[root], event['path'])
+        event_type = event['type']
+        started = time.perf_counter()  # 监控线程可能在操作完成之前就已收到事件
+
+        if event_type in ('created', 'modified'):
+            self._write(path, event.get('size', 0))
+        elif event_type == 'moved':
+            dest = os.path.join(self.folders[root], event['dest'])
+            if os.path.exists(path):
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                os.replace(path, dest)
+            self._write(dest, event.get('size', 0))
+            path = dest
+        elif event_type == 'deleted':
+            if os.path.exists(path):
+                os.remove(path)
+            return True
+        else:
+            return False  # opened / closed 等由上面的操作自然产生
+        self.writes.setdefault(os.path.basename(path), []).append(started)
+        return True
+
+    def _write(self, path: str, size: int):
+        """把文件扩展（或截断）到 size 字节，追加的部分使用合成内容"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        current = os.path.getsize(path) if os.path.exists(path) else 0
+        with open(path, 'r+b' if current else 'wb') as f:
+            if size < current:
+                f.truncate(size)
+            elif size > current:
+                f.seek(current)
+                f.write(_content(os.path.basename(path), current, size - current))
+
+
+def _latency_stats(samples: List[float]) -> Optional[Dict[str, float]]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))] * 1000
+
+    return {
+        'count': len(ordered),
+        'min_ms': ordered[0] * 1000,
+        'p50_ms': statistics.median(ordered) * 1000,
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+        'max_ms': ordered[-1] * 1000,
+        'mean_ms': statistics.mean(ordered) * 1000,
+    }
+
+
+def replay(events: List[Dict[str, Any]], speed: float = 1.0, timeout: float = 120.0,
+           settle: float = 1.0, workdir: Optional[str] = None, config: Optional[Config] = None,
+           quiet: bool = True) -> Dict[str, Any]:
+    """在沙盒文件夹中启动 EasyShaApp（模拟通知/托盘/剪贴板）并回放 events，返回统计报告"""
+    from main import EasyShaApp
+
+    roots = [e['root'] for e in events if e.get('kind') == 'fs' and e.get('root') is not None]
+    folder_count = max(roots) + 1 if roots else 1
+    # 需要得出结论的文件：最终落地的正式文件（校验和文件的结果是汇总通知，不计入）
+    expected = sorted({os.path.basename(e.get('dest') or e['path']) for e in events
+                       if e.get('kind') == 'fs' and e.get('type') in ('moved', 'modified')
+                       and not (e.get('dest') or e['path']).endswith(_TEMP_SUFFIXES)
+                       and not is_checksum_file(e.get('dest') or e['path'])})
+
+    with contextlib.ExitStack() as stack:
+        base = workdir or stack.enter_context(tempfile.TemporaryDirectory(prefix='easysha-sim-'))
+        folders = [os.path.join(base, f"root{i}") for i in range(folder_count)]
+        for folder in folders:
+            os.makedirs(folder, exist_ok=True)
+
+        config = config or Config()
+        config.download_folders = folders
+        config.trace_file = None
+        config.ipc_enabled = False
+
+        notifier = StubNotifier()
+        tray = StubTray()
+        clipboard = StubClipboardMonitor()
+        if quiet:
+            devnull = stack.enter_context(open(os.devnull, 'w'))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+
+        app = EasyShaApp(config, notifier=notifier, tray=tray, clipboard_monitor=clipboard)
+        tray.app = app
+        app.start()
+        while not clipboard.running:
+            time.sleep(0.001)
+
+        driver = ReplayDriver(app, folders, clipboard)
+        started = time.perf_counter()
+        try:
+            driver.play(events, speed)
+            played = time.perf_counter()
+            completed = notifier.wait_for(expected, timeout)
+            notifier.wait_idle(settle, timeout)
+        finally:
+            app.shutdown()
+        finished = time.perf_counter()
+
+    latencies = []
+    last_verdict = started
+    for name, (t, _) in notifier.first_verdict.items():
+        last_verdict = max(last_verdict, t)
+        # 延迟 = 结论时间 - 结论之前最后一次写入的时间
+        writes = driver.writes.get(name, [])
+        index = bisect.bisect_right(writes, t)
+        if index:
+            latencies.append(t - writes[index - 1])
+
+    verdicts: Dict[str, int] = {}
+    for _, kind, _ in notifier.events:
+        verdicts[kind] = verdicts.get(kind, 0) + 1
+
+    processed = sum(1 for name in expected if name in notifier.first_verdict)
+    elapsed = last_verdict - started
+    return {
+        'events': driver.counts,
+        'event_errors': driver.errors,
+        'files': len(expected),
+        'files_with_verdict': processed,
+        'completed': completed,
+        'notifications': verdicts,
+        'icon_states': len(tray.states),
+        'playback_s': played - started,
+        'wall_s': finished - started,
+        'throughput_files_s': processed / elapsed if elapsed > 0 else 0.0,
+        'latency': _latency_stats(latencies),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="EasySha 事件回放 / 模拟")
+    parser.add_argument('trace', nargs='?',
+                        help="main.py --record 生成的事件记录（剪贴板的值是真实文件的摘要，"
+                             "与回放生成的文件内容不符，只会检测到哈希而不会比对成功）")
+    parser.add_argument('--synthetic', type=int, metavar='N', help="不读取记录，合成 N 次下载")
+    parser.add_argument('--size', default='256K', help="合成下载的文件大小（如 64K、4M）")
+    parser.add_argument('--rate', type=float, default=100.0, help="合成下载每秒开始的数量")
+    parser.add_argument('--clipboard-ratio', type=float, default=0.5, help="复制了校验和的下载比例")
+    parser.add_argument('--clipboard-order', choices=('before', 'after', 'mixed'), default='mixed',
+                        help="校验和在下载之前还是之后复制")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save-trace', metavar='FILE', help="保存合成的事件序列")
+    parser.add_argument('--speed', type=float, default=1.0, help="回放倍速（0 表示不等待）")
+    parser.add_argument('--timeout', type=float, default=120.0, help="等待处理完成的最长秒数")
+    parser.add_argument('--workdir', help="沙盒文件夹（默认使用临时目录并在结束后删除）")
+    parser.add_argument('--verbose', action='store_true', help="显示应用自身的输出")
+    parser.add_argument('-o', '--output', help="报告写入文件（默认输出到标准输出）")
+    args = parser.parse_args(argv)
+    if not args.trace and not args.synthetic:
+        parser.error("需要指定事件记录文件或 --synthetic N")
+    return args
+
+
+def main(argv=None) -> int:
+    from benchmarks.common import parse_size
+
+    args = parse_args(argv)
+    if args.synthetic:
+        size = parse_size(args.size)
+        events = synthesize(args.synthetic, size, args.rate,
+                            clipboard_ratio=args.clipboard_ratio,
+                            clipboard_order=args.clipboard_order, seed=args.seed)
+        if args.save_trace:
+            write_trace(args.save_trace, events, {'synthetic': args.synthetic, 'size': size})
+    else:
+        events = sorted(read_trace(args.trace), key=lambda e: e.get('t', 0.0))
+
+    report = replay(events, args.speed, args.timeout, workdir=args.workdir, quiet=not args.verbose)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0 if report['completed'] and not report['event_errors'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+
+# sim/stubs.py
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from core.clipboard_monitor import ClipboardMonitor
+
+# 表示某个文件已经得出结论的通知类型
+VERDICTS = ('file_detected', 'verification_success', 'verification_failed')
+
+
+class StubNotifier:
+    """接口与 NotificationService 相同，只记录每次通知（时间戳、类型、文件名）"""
+
+    def __init__(self, app_name: str = "EasySha", app_icon: str = None):
+        self.app_name = app_name
+        self.app_icon = app_icon
+        self.callback_handler = None
+        self.events: List[Tuple[float, str, Any]] = []
+        self.first_verdict: Dict[str, Tuple[float, str]] = {}  # 文件名 -> 第一条结论的 (时间, 类型)
+        self._cond = threading.Condition()
+
+    def _record(self, kind: str, subject: Any = None):
+        with self._cond:
+            now = time.perf_counter()
+            self.events.append((now, kind, subject))
+            if kind in VERDICTS and subject not in self.first_verdict:
+                self.first_verdict[subject] = (now, kind)
+            self._cond.notify_all()
+
+    def set_callback_handler(self, handler):
+        self.callback_handler = handler
+
+    def set_sound_enabled(self, enabled: bool):
+        pass
+
+    def show_file_detected(self, file_name: str, file_size: str, hashes: Dict[str, str]):
+        self._record('file_detected', file_name)
+
+    def show_verification_success(self, file_name: str):
+        self._record('verification_success', file_name)
+
+    def show_verification_failed(self, file_name: str, expected: str, actual: str):
+        self._record('verification_failed', file_name)
+
+    def show_batch_result(self, checksum_name: str, passed, failed, missing):
+        self._record('batch_result', checksum_name)
+
+    def show_clipboard_detected(self, hash_value: str):
+        self._record('clipboard_detected')
+
+    def show_ready(self):
+        self._record('ready')
+
+    def show_info(self, title: str, message: str):
+        self._record('info', title)
+
+    def wait_for(self, names, timeout: float) -> bool:
+        """等待 names 中的每个文件都得出结论（检测到文件或验证结果）"""
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while not all(name in self.first_verdict for name in names):
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def wait_verdict(self, name: str, since: float, timeout: float) -> float:
+        """等待某个文件在 since 之后的第一条结论，返回其时间"""
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while True:
+                for t, kind, subject in self.events:
+                    if t >= since and kind in VERDICTS and subject == name:
+                        return t
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise TimeoutError(f"等待 {name} 的通知超时")
+                self._cond.wait(remaining)
+
+    def wait_idle(self, settle: float, timeout: float) -> bool:
+        """等待连续 settle 秒没有新通知"""
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while True:
+                last = self.events[-1][0] if self.events else 0.0
+                now = time.perf_counter()
+                if now - last >= settle:
+                    return True
+                if now >= deadline:
+                    return False
+                self._cond.wait(min(settle - (now - last), deadline - now))
+
+
+class StubTray:
+    """接口与 SystemTray 相同，只记录图标状态的变化"""
+
+    def __init__(self, app=None):
+        self.app = app
+        self.icon = None
+        self.states: List[Tuple[float, str]] = []
+
+    def update_icon_state(self, status: str = "normal"):
+        self.states.append((time.perf_counter(), status))
+
+    def run(self):
+        pass
+
+
+class StubClipboardMonitor(ClipboardMonitor):
+    """内存剪贴板：push() 立即触发与真实剪贴板相同的哈希判断和回调，不需要轮询"""
+
+    def __init__(self):
+        super().__init__(paste=lambda: self.last_content)
+        self.copied: List[str] = []
+
+    def start(self, callback):
+        self.app = callback
+        self.running = True
+
+    def push(self, text: str):
+        """模拟用户复制了一段文本"""
+        if text == self.last_content:
+            return
+        self.last_content = text
+        if self.running and not self._is_own(text) and self._is_hash(text):
+            self.app(text)
+
+    def copy(self, text: str):
+        self.copied.append(text)
+        self.own_content = text
+        self.last_content = text